@@ -0,0 +1,67 @@
+"""
+Benchmark: cross-source de-duplication accuracy and speed.
+
+Checks every labelled pair in `fixtures/dedup/cases.json` ("same": whether
+the two items must collapse into one), then times `dedup_items` over a
+synthetic batch of titles. Exits non-zero if any labelled pair is wrong.
+
+Usage:
+    python scripts/bench_dedup.py
+    python scripts/bench_dedup.py --items 20000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from dedup import dedup_items
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fixtures", "dedup", "cases.json")
+SYLLABLES = "ka lo mi ne ru sa to vi ze bo".split()
+SOURCES = ("Hacker News", "V2EX", "36Kr", "Weibo Hot Search", "Tencent News")
+
+
+def check_cases(path):
+    with open(path, encoding="utf-8") as f:
+        cases = json.load(f)
+    failures = 0
+    for case in cases:
+        merged = len(dedup_items([dict(case["a"]), dict(case["b"])])) == 1
+        ok = merged == case["same"]
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {'same' if case['same'] else 'diff'}  {case['note']}")
+    return failures
+
+
+def synthetic(n, seed=0):
+    """`n` distinct titles (4-10 words from a 1000-word vocabulary) spread over the sources."""
+    rng = random.Random(seed)
+    words = ["".join(rng.choice(SYLLABLES) for _ in range(3)) for _ in range(1000)]
+    return [{"source": rng.choice(SOURCES), "url": f"https://ex.com/{i}",
+             "title": " ".join(rng.choice(words) for _ in range(rng.randint(4, 10)))}
+            for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', default=FIXTURES, help='Labelled pairs. Default fixtures/dedup/cases.json')
+    parser.add_argument('--items', type=int, default=5000, help='Synthetic items to time. Default 5000')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions; the best run is reported. Default 3')
+    args = parser.parse_args()
+
+    failures = check_cases(args.cases)
+    items = synthetic(args.items)
+    best = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        kept = dedup_items([dict(item) for item in items])
+        best = min(best, time.perf_counter() - t0)
+    print(f"{args.items} items -> {len(kept)} kept, best {best * 1000:.0f}ms ({args.items / best:.0f} items/sec)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: deep-fetch text extraction on threads vs an ExtractionPool.
+
+Runs extraction over a set of saved article pages the way `--deep` does:
+"threads" is the single-stage model (each download thread also extracts, so
+extraction serialises on the GIL), "processes" is the two-stage model (pages
+handed to worker processes in batches). Network time is excluded; pages are
+read from disk first. Reports best wall time and pages/sec.
+
+Usage:
+    python scripts/bench_extract.py pages/*.html --copies 10
+    python scripts/bench_extract.py fixtures/run1 --workers 2,4 --batch 4,8,16
+
+A directory recorded with `fetch_news.py --record` contributes its HTML bodies.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import time
+
+from extraction import ExtractionPool, default_workers, extract_content
+from fetch_news import CONTENT_CHARS
+
+
+def load_pages(paths):
+    pages = []
+    for path in paths:
+        if os.path.isdir(path):
+            with open(os.path.join(path, "index.json"), encoding="utf-8") as f:
+                index = json.load(f)
+            for entry in index.values():
+                content_type = {k.lower(): v for k, v in entry["headers"].items()}.get("content-type", "")
+                if entry["status"] == 200 and "html" in content_type:
+                    with open(os.path.join(path, entry["file"]), "rb") as f:
+                        pages.append(f.read())
+        else:
+            with open(path, "rb") as f:
+                pages.append(f.read())
+    return pages
+
+
+def run_threads(pages, threads):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(lambda markup: extract_content(markup, CONTENT_CHARS), pages))
+
+
+def run_pool(pages, workers, batch_size):
+    # Includes pool start-up, as --deep pays it once per run
+    with ExtractionPool(workers, batch_size=batch_size) as pool:
+        futures = [pool.submit(pages[i:i + batch_size], CONTENT_CHARS) for i in range(0, len(pages), batch_size)]
+        return [text for future in futures for text, _ in future.result()]
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('pages', nargs='+', help='HTML files, or fixture directories recorded with --record')
+    parser.add_argument('--copies', type=int, default=1, help='Repeat the page set N times (e.g. to reach 80 pages). Default 1')
+    parser.add_argument('--threads', type=int, default=10, help='Threads for the single-stage run. Default 10')
+    parser.add_argument('--workers', default=str(default_workers()), help='Comma-separated process counts. Default: CPUs, at most 4')
+    parser.add_argument('--batch', default='8', help='Comma-separated batch sizes. Default 8')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions; the best run is reported. Default 3')
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages) * args.copies
+    if not pages:
+        parser.error("no HTML pages found")
+    print(f"{len(pages)} pages, {sum(map(len, pages)) / 1024:.0f}KB")
+    print(f"{'mode':<28} {'best':>10} {'pages/sec':>10} {'speedup':>8}")
+    base = best_of(lambda: run_threads(pages, args.threads), args.repeat)
+    print(f"{f'threads x{args.threads}':<28} {base * 1000:>8.0f}ms {len(pages) / base:>10.1f} {1.0:>7.2f}x")
+    for workers in (int(w) for w in args.workers.split(',')):
+        for batch_size in (int(b) for b in args.batch.split(',')):
+            seconds = best_of(lambda: run_pool(pages, workers, batch_size), args.repeat)
+            label = f"processes x{workers}, batch {batch_size}"
+            print(f"{label:<28} {seconds * 1000:>8.0f}ms {len(pages) / seconds:>10.1f} {base / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: every fetch_* parse path and fetch_url_content extraction, offline.
+
+Record a corpus once (with network), then benchmark it anywhere:
+    python scripts/fetch_news.py --source all --limit 30 --deep --record fixtures/run1
+    python scripts/bench_fetchers.py fixtures/run1 --repeat 5
+
+HTTP is served by replay.ReplayAdapter, so timings cover parsing and
+extraction only. Recorded URLs not used by any source fetcher are treated as
+deep-fetch article pages. Reports best wall time, items/sec and peak traced
+memory per stage.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import fetch_news
+import html_sources
+import http_client
+from replay import ReplayAdapter
+from sources import SOURCES, load_source
+
+
+def measure(func, repeat):
+    """Returns (best seconds, result of the last run, peak traced bytes)."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, result, peak
+
+
+def report(name, seconds, count, peak):
+    rate = count / seconds if seconds > 0 else float('inf')
+    print(f"{name:<16} {count:>6} {seconds * 1000:>10.2f}ms {rate:>12.1f} {peak / 1024:>10.0f}KB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('fixtures', help='Directory recorded with fetch_news.py --record')
+    parser.add_argument('--source', default='all', help='Source(s) to benchmark (comma-separated). Default all')
+    parser.add_argument('--limit', type=int, default=30, help='Limit passed to each fetcher. Default 30')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetitions; the best run is reported. Default 5')
+    args = parser.parse_args()
+
+    adapter = ReplayAdapter(args.fixtures)
+    http_client.configure(adapter=adapter, retries=0)
+    html_sources.HN_PAGE_DELAY = 0
+    names = list(SOURCES) if args.source == 'all' else [s.strip() for s in args.source.split(',')]
+
+    print(f"{'stage':<16} {'items':>6} {'best':>12} {'items/sec':>12} {'peak mem':>12}")
+    for name in names:
+        try:
+            seconds, items, peak = measure(lambda: load_source(name)(args.limit), args.repeat)
+        except Exception as e:
+            print(f"{name:<16} skipped: {e}")
+            continue
+        report(name, seconds, len(items), peak)
+
+    # Everything a source fetcher did not request is an article page from --deep
+    articles = []
+    for url, entry in adapter.index.items():
+        content_type = {k.lower(): v for k, v in entry['headers'].items()}.get('content-type', 'text/html')
+        if url not in adapter.served and entry['status'] == 200 and 'html' in content_type:
+            articles.append(url)
+    if articles:
+        seconds, texts, peak = measure(lambda: [fetch_news.fetch_url_content(url) for url in articles], args.repeat)
+        report('fetch_url_content', seconds, sum(1 for t in texts if t), peak)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: Hacker News page parsing, per-row document-wide selects vs the
+single-pass indexed parser in html_sources.parse_hackernews_page.
+
+Usage:
+    python scripts/bench_hn_parse.py saved/news_p1.html saved/news_p2.html
+    python scripts/bench_hn_parse.py --synthetic 30 --repeat 20
+
+Save pages with e.g. `curl -o news_p1.html "https://news.ycombinator.com/news?p=1"`.
+Without page files a synthetic HN-shaped page is generated.
+"""
+
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from html_sources import HN_BASE_URL, parse_hackernews_page
+
+
+def parse_legacy(html, base_url=HN_BASE_URL):
+    # The previous parser: two whole-document selects per story row
+    soup = BeautifulSoup(html, 'html.parser')
+    items = []
+    for row in soup.select('.athing'):
+        id_ = row.get('id')
+        title_line = row.select_one('.titleline a')
+        if not title_line: continue
+        score_span = soup.select_one(f'#score_{id_}')
+        age_span = soup.select_one(f'.age a[href="item?id={id_}"]')
+        link = title_line.get('href')
+        if link and link.startswith('item?id='): link = f"{base_url}/{link}"
+        items.append({
+            "source": "Hacker News",
+            "title": title_line.get_text(),
+            "url": link,
+            "heat": score_span.get_text() if score_span else "0 points",
+            "time": age_span.get_text() if age_span else ""
+        })
+    return items
+
+
+def synthetic_page(rows):
+    parts = ['<html><head><title>Hacker News</title></head><body><center><table id="hnmain"><tr><td><table>']
+    for i in range(rows):
+        id_ = 40000000 + i
+        parts.append(
+            f'<tr class="athing submission" id="{id_}"><td class="title"><span class="rank">{i + 1}.</span></td>'
+            f'<td class="votelinks"><a id="up_{id_}" href="vote?id={id_}&how=up"><div class="votearrow"></div></a></td>'
+            f'<td class="title"><span class="titleline"><a href="https://example.com/story/{i}">Story number {i} about things</a>'
+            f'<span class="sitebit comhead"> (<a href="from?site=example.com"><span class="sitestr">example.com</span></a>)</span></span></td></tr>'
+            f'<tr><td colspan="2"></td><td class="subtext"><span class="subline">'
+            f'<span class="score" id="score_{id_}">{i * 7 % 500} points</span> by <a href="user?id=u{i}" class="hnuser">u{i}</a> '
+            f'<span class="age" title="2026-01-01T00:00:00"><a href="item?id={id_}">{i % 23 + 1} hours ago</a></span> '
+            f'<span id="unv_{id_}"></span> | <a href="hide?id={id_}">hide</a> | <a href="item?id={id_}">{i % 90} comments</a>'
+            f'</span></td></tr><tr class="spacer" style="height:5px"></tr>'
+        )
+    parts.append('</table></td></tr></table></center></body></html>')
+    return ''.join(parts)
+
+
+def bench(func, pages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for html in pages:
+            func(html)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('pages', nargs='*', help='Saved HN listing pages (HTML files)')
+    parser.add_argument('--synthetic', type=int, default=30, help='Rows per synthetic page when no files are given. Default 30')
+    parser.add_argument('--repeat', type=int, default=10, help='Repetitions; the best run is reported. Default 10')
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = [open(p, encoding='utf-8').read() for p in args.pages]
+    else:
+        pages = [synthetic_page(args.synthetic)]
+
+    # The legacy parser predates `timestamp` (parsed from the age span), so it is left out of the comparison
+    current = [{k: v for k, v in item.items() if k != 'timestamp'} for item in parse_hackernews_page(pages[0])]
+    assert parse_legacy(pages[0]) == current, "parsers disagree"
+    rows = sum(len(parse_hackernews_page(p)) for p in pages)
+    legacy = bench(parse_legacy, pages, args.repeat)
+    indexed = bench(parse_hackernews_page, pages, args.repeat)
+    print(f"pages={len(pages)} rows={rows}")
+    print(f"legacy per-row selects: {legacy * 1000:8.2f} ms")
+    print(f"single-pass indexed:    {indexed * 1000:8.2f} ms  ({legacy / indexed:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: HTML parser backends per source over recorded pages.
+
+For every recorded page it times a full-document parse with each installed
+backend, then the source's own parse function (which uses partial parsing
+where the scraper only needs a subtree), and prints the fastest backend.
+
+Usage:
+    python scripts/bench_parsers.py github=pages/trending.html 36kr=pages/newsflashes.html \
+        hackernews=pages/hn_p1.html producthunt=pages/feed.xml article=pages/story.html
+
+Sources: hackernews, github, 36kr, producthunt, article (deep-fetch main-content extraction, see readability).
+"""
+
+import argparse
+import time
+
+import html_parser
+import readability
+from html_sources import parse_36kr, parse_github, parse_hackernews_page, parse_producthunt
+
+PARSERS = {
+    'hackernews': parse_hackernews_page,
+    'github': parse_github,
+    '36kr': parse_36kr,
+    'producthunt': parse_producthunt,
+}
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_source(source, markup, repeat):
+    rows = []
+    for backend in html_parser.available_backends():
+        full = best_of(lambda: html_parser.parse(markup, backend=backend), repeat)
+        if source == 'article':
+            scoped = best_of(lambda: readability.main_text(markup, backend=backend), repeat)
+        else:
+            html_parser.set_backend(backend, source=source)
+            scoped = best_of(lambda: PARSERS[source](markup), repeat)
+        rows.append((backend, full, scoped))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('pages', nargs='+', help='source=path pairs of recorded pages')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetitions; the best run is reported. Default 5')
+    args = parser.parse_args()
+
+    print(f"{'source':<12} {'backend':<12} {'full parse':>12} {'source parse':>13}")
+    for pair in args.pages:
+        source, _, path = pair.partition('=')
+        if source not in PARSERS and source != 'article':
+            parser.error(f"unknown source: {source}")
+        with open(path, 'rb') as f:
+            markup = f.read()
+        if source != 'article':
+            markup = markup.decode('utf-8', errors='replace')
+        rows = bench_source(source, markup, args.repeat)
+        for backend, full, scoped in rows:
+            print(f"{source:<12} {backend:<12} {full * 1000:>10.2f}ms {scoped * 1000:>11.2f}ms")
+        fastest = min(rows, key=lambda r: r[2])[0]
+        print(f"{source:<12} fastest: {fastest}")
+
+
+if __name__ == "__main__":
+    main()
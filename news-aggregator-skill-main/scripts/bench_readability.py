@@ -0,0 +1,84 @@
+"""
+Benchmark: main-content extraction speed and quality on labelled pages.
+
+The fixture set lives in `fixtures/extraction/`: each `<name>.html` page has a
+`<name>.txt` label holding its article text. Both extraction modes of
+`extraction.extract_content` run on every page: "page" (whole-page visible
+text, the old behaviour) and "main" (the `readability` main-content block).
+Quality is token precision/recall/F1 against the label (words, and single
+characters for CJK text); precision drops when menus, banners or comments
+leak in. Speed is the best of --repeat runs.
+
+Usage:
+    python scripts/bench_readability.py
+    python scripts/bench_readability.py path/to/fixtures --repeat 20
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+from collections import Counter
+
+from extraction import extract_content
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = os.path.join(HERE, os.pardir, "fixtures", "extraction")
+MAX_CHARS = 100000
+_TOKEN = re.compile(r"[0-9a-z]+|[㐀-䶿一-鿿豈-﫿]")
+
+
+def tokens(text):
+    return Counter(_TOKEN.findall(text.lower()))
+
+
+def score(extracted, label):
+    """(precision, recall, F1) of extracted tokens against the label's."""
+    got, want = tokens(extracted), tokens(label)
+    overlap = sum((got & want).values())
+    precision = overlap / sum(got.values()) if got else 0.0
+    recall = overlap / sum(want.values()) if want else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def best_of(func, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('fixtures', nargs='?', default=DEFAULT_FIXTURES, help='Directory of <name>.html + <name>.txt pairs')
+    parser.add_argument('--repeat', type=int, default=10, help='Repetitions; the best run is reported. Default 10')
+    args = parser.parse_args()
+
+    pages = sorted(glob.glob(os.path.join(args.fixtures, "*.html")))
+    if not pages:
+        parser.error(f"no fixtures in {args.fixtures}")
+    totals = {"page": [0.0, 0.0, 0.0, 0.0], "main": [0.0, 0.0, 0.0, 0.0]}
+    print(f"{'page':<28} {'mode':<5} {'time':>8} {'prec':>6} {'recall':>6} {'F1':>6}")
+    for path in pages:
+        with open(path, "rb") as f:
+            markup = f.read()
+        with open(path[:-len(".html")] + ".txt", encoding="utf-8") as f:
+            label = f.read()
+        name = os.path.basename(path)[:-len(".html")]
+        for mode in ("page", "main"):
+            seconds, text = best_of(lambda: extract_content(markup, MAX_CHARS, main=mode == "main"), args.repeat)
+            precision, recall, f1 = score(text, label)
+            for i, value in enumerate((seconds, precision, recall, f1)):
+                totals[mode][i] += value
+            print(f"{name:<28} {mode:<5} {seconds * 1000:>6.2f}ms {precision:>6.2f} {recall:>6.2f} {f1:>6.2f}")
+    for mode, (seconds, precision, recall, f1) in totals.items():
+        n = len(pages)
+        print(f"{'mean':<28} {mode:<5} {seconds / n * 1000:>6.2f}ms {precision / n:>6.2f} {recall / n:>6.2f} {f1 / n:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: fetch_news.py import time per source subset.
+
+Each subset is imported in a fresh interpreter under `python -X importtime`:
+fetch_news itself plus the source modules the registry loads for that subset.
+The `eager` row imports everything fetch_news used to import up front (every
+source, the HTML stack, the content store, watch and replay support), so the
+saving column is what lazy loading buys for that subset. Import time is summed
+over all modules (the "self" column), best of --repeat runs.
+
+Usage:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --subset weibo,v2ex --subset github --repeat 10
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+from sources import SOURCES
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EAGER = "import html_parser, content_store, watch, replay, concurrent.futures"
+PROBE_MODULES = ("bs4", "sqlite3", "concurrent.futures")
+
+
+def default_subsets():
+    """(label, sources): each source alone, then the JSON-only, HTML-only and full sets."""
+    by_module = {}
+    for name, (module, _, _) in SOURCES.items():
+        by_module.setdefault(module, []).append(name)
+    subsets = [(name, [name]) for name in SOURCES]
+    subsets += [(module.replace('_sources', '-only'), names) for module, names in by_module.items()]
+    subsets.append(('all', list(SOURCES)))
+    return subsets
+
+
+def import_profile(code):
+    """Runs `code` under -X importtime; returns (total microseconds, set of imported module names)."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=HERE,
+                          capture_output=True, text=True, check=True)
+    total, modules = 0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        modules.add(name.strip())
+    return total, modules
+
+
+def best_profiles(codes, repeat):
+    """Best (total, modules) per code; runs are interleaved so machine load drifts hit every subset alike."""
+    best = [None] * len(codes)
+    for _ in range(repeat):
+        for i, code in enumerate(codes):
+            run = import_profile(code)
+            if best[i] is None or run[0] < best[i][0]:
+                best[i] = run
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subset', action='append', help='Comma-separated sources; repeatable. Default: each source, json-only, html-only, all')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per subset; the fastest is reported. Default 10')
+    args = parser.parse_args()
+    if args.subset:
+        subsets = [(subset, [s.strip() for s in subset.split(',')]) for subset in args.subset]
+    else:
+        subsets = default_subsets()
+
+    base = "import fetch_news, sources"
+    eager_code = f"{base}; {EAGER}" + "".join(f"; sources.load_source({name!r})" for name in SOURCES)
+    codes = [eager_code] + [base + "".join(f"; sources.load_source({name!r})" for name in subset)
+                            for _, subset in subsets]
+    import_profile(eager_code)  # warm the bytecode caches
+    (eager, _), *profiles = best_profiles(codes, args.repeat)
+
+    print(f"{'sources':<28} {'import':>10} {'saving':>10}  {' '.join(PROBE_MODULES)}")
+    print(f"{'eager (before lazy loading)':<28} {eager / 1000:>8.1f}ms")
+    for (label, _), (total, modules) in zip(subsets, profiles):
+        loaded = " ".join(("yes" if module in modules else "no").ljust(len(module)) for module in PROBE_MODULES)
+        print(f"{label:<28} {total / 1000:>8.1f}ms {(eager - total) / 1000:>8.1f}ms  {loaded}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Persistent store for deep-fetched article text.
+
+A small SQLite table keyed by canonical URL holds the extracted text, fetch
+time and a content hash, so `--deep` only downloads URLs it has not seen
+within the expiry window. Old rows expire and the table is capped at
+`max_entries`, dropping the least recently used rows first.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from http_cache import CACHE_DIR
+from urls import canonical_url
+
+
+class ContentStore:
+    def __init__(self, path=None, ttl=7 * 24 * 3600, max_entries=20000, refresh=False):
+        """`refresh` skips lookups (every URL is refetched) but still stores results."""
+        self.refresh = refresh
+        self.path = path or os.path.join(CACHE_DIR, "content.db")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS content (
+                url TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS content_accessed ON content(accessed_at)")
+        self._db.commit()
+
+    def get_many(self, urls):
+        """Returns {canonical_url: content} for the given URLs that have a live entry."""
+        keys = list({canonical_url(u) for u in urls if u})
+        if not keys or self.refresh:
+            return {}
+        now = time.time()
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._db.execute(
+                    f"SELECT url, content FROM content WHERE fetched_at > ? AND url IN ({','.join('?' * len(chunk))})",
+                    [now - self.ttl] + chunk).fetchall()
+                found.update(rows)
+            if found:
+                self._db.executemany("UPDATE content SET accessed_at = ? WHERE url = ?",
+                                     [(now, key) for key in found])
+                self._db.commit()
+        return found
+
+    def put_many(self, pairs):
+        """Stores (url, content) pairs; empty content is not stored."""
+        now = time.time()
+        rows = [(canonical_url(u), c, hashlib.sha1(c.encode("utf-8")).hexdigest(), now, now)
+                for u, c in pairs if u and c]
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO content VALUES (?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+
+    def prune(self):
+        """Drops expired rows, then the least recently used ones above `max_entries`."""
+        with self._lock:
+            self._db.execute("DELETE FROM content WHERE fetched_at <= ?", (time.time() - self.ttl,))
+            self._db.execute("""
+                DELETE FROM content WHERE url IN (
+                    SELECT url FROM content ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )""", (self.max_entries,))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
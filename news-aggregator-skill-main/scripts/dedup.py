@@ -0,0 +1,121 @@
+"""
+Cross-source de-duplication of news items.
+
+Items are collapsed when their canonical URLs match or their titles are
+near-identical. Titles are tokenised into lower-cased words plus CJK character
+bigrams (so Chinese and English titles both work), summarised with MinHash and
+indexed with LSH bands; candidates sharing a band are confirmed with the exact
+Jaccard similarity of their token sets.
+
+Title matches are deliberately strict, since dropping a distinct story is worse
+than keeping a duplicate: they need at least MIN_TOKENS tokens and a Jaccard
+similarity of THRESHOLD, titles that differ in a number ("Rust 1.79" / "Rust
+1.80", "iPhone 15" / "iPhone 16") stay apart, and only items from different
+sources are merged by title (within one source, only by URL).
+"""
+
+import hashlib
+import re
+
+from urls import canonical_url
+
+_WORD = re.compile(r"[0-9a-z]+(?:['.][0-9a-z]+)*")
+_CJK = re.compile(r"[㐀-䶿一-鿿豈-﫿]+")
+
+THRESHOLD = 0.8
+MIN_TOKENS = 4
+
+_PRIME = (1 << 61) - 1
+_NUM_PERM = 32
+_BANDS = 16
+_ROWS = _NUM_PERM // _BANDS
+_PERMS = [(int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _PRIME or 1,
+           int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _PRIME)
+          for i in range(_NUM_PERM)]
+
+
+def title_tokens(title):
+    """Lower-cased words and CJK character bigrams (single CJK chars stay unigrams)."""
+    text = (title or "").lower()
+    tokens = set(_WORD.findall(text))
+    for run in _CJK.findall(text):
+        if len(run) == 1:
+            tokens.add(run)
+        tokens.update(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def minhash(tokens):
+    hashes = [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "big") for t in tokens]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+
+
+class Deduplicator:
+    """
+    Incremental near-duplicate index. `add(item)` returns None when the item is
+    new (it becomes a representative) or the representative it was merged into.
+    Representatives gain `sources` (all source names) and `duplicates`
+    (source/title/url/heat of every collapsed item).
+    """
+
+    def __init__(self, threshold=THRESHOLD):
+        self.threshold = threshold
+        self.items = []
+        self._by_url = {}
+        self._bands = {}
+        self._tokens = []
+
+    def add(self, item):
+        key = canonical_url(item.get("url"))
+        match = self._by_url.get(key) if key else None
+        tokens = title_tokens(item.get("title"))
+        bands = []
+        if len(tokens) >= MIN_TOKENS:
+            signature = minhash(tokens)
+            bands = [(i, tuple(signature[i * _ROWS:(i + 1) * _ROWS])) for i in range(_BANDS)]
+        if match is None:
+            seen = set()
+            for band in bands:
+                for idx in self._bands.get(band, ()):
+                    if idx in seen: continue
+                    seen.add(idx)
+                    if self._same_title(item, tokens, idx):
+                        match = idx
+                        break
+                if match is not None: break
+
+        if match is not None:
+            self._merge(self.items[match], item)
+            return self.items[match]
+
+        idx = len(self.items)
+        self.items.append(item)
+        self._tokens.append(tokens)
+        if key: self._by_url[key] = idx
+        for band in bands:
+            self._bands.setdefault(band, []).append(idx)
+        return None
+
+    def _same_title(self, item, tokens, idx):
+        rep, other = self.items[idx], self._tokens[idx]
+        if item.get("source") in (rep.get("sources") or [rep.get("source")]):
+            return False
+        if any(any(c.isdigit() for c in token) for token in tokens ^ other):
+            return False
+        return len(tokens & other) / len(tokens | other) >= self.threshold
+
+    @staticmethod
+    def _merge(rep, item):
+        sources = rep.setdefault("sources", [rep.get("source")])
+        if item.get("source") not in sources:
+            sources.append(item.get("source"))
+        rep.setdefault("duplicates", []).append(
+            {k: item.get(k) for k in ("source", "title", "url", "heat") if item.get(k) is not None})
+
+
+def dedup_items(items, threshold=THRESHOLD):
+    """Returns the representatives of `items` in first-seen order."""
+    index = Deduplicator(threshold)
+    for item in items:
+        index.add(item)
+    return index.items
@@ -1,323 +1,520 @@
 import argparse
 import json
-import requests
-from bs4 import BeautifulSoup
+import os
 import sys
 import time
 import re
-import concurrent.futures
-from datetime import datetime
+import functools
+import threading
+from scheduler import HostScheduler, run_sources
+import http_client
+import instrument
+from http_cache import ResponseCache
+from urls import canonical_url
+from dedup import Deduplicator, dedup_items
+from matcher import KeywordMatcher
+from resilience import CircuitBreaker
+from sources import CACHE_TTLS, SOURCES, load_source
+from normalise import TopK, normalise, parse_since
 
-# Headers for scraping to avoid basic bot detection
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-}
+# Source modules, the HTML stack (html_parser/bs4), the content store (sqlite3) and
+# watch/replay support are imported only when the run needs them; see sources.py
 
-def filter_items(items, keyword=None):
-    if not keyword:
-        return items
-    keywords = [k.strip() for k in keyword.split(',') if k.strip()]
-    pattern = '|'.join([r'\b' + re.escape(k) + r'\b' for k in keywords])
-    regex = r'(?i)(' + pattern + r')'
-    return [item for item in items if re.search(regex, item['title'])]
+CONTENT_CHARS = 3000
+MAX_CONTENT_BYTES = 1024 * 1024
+HTML_TYPES = ('text/html', 'application/xhtml+xml')
+_PARAGRAPH = re.compile(rb'<p[\s>].*?</p\s*>', re.S | re.I)
+_TAG = re.compile(rb'<[^>]*>')
+
+def read_html_capped(response, max_bytes=MAX_CONTENT_BYTES, min_chars=CONTENT_CHARS):
+    """
+    Reads a streamed response up to `max_bytes`, stopping early once the
+    completed <p> elements seen so far hold `min_chars` of text.
+    Returns None for non-HTML content types without reading the body.
+    """
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if content_type and content_type not in HTML_TYPES:
+        return None
+    buf = bytearray()
+    scanned = 0
+    paragraph_chars = 0
+    for chunk in response.iter_content(chunk_size=16384):
+        buf += chunk
+        if len(buf) >= max_bytes:
+            del buf[max_bytes:]
+            break
+        end = scanned
+        for m in _PARAGRAPH.finditer(buf, scanned):
+            paragraph_chars += len(_TAG.sub(b'', m.group()).strip().decode('utf-8', 'ignore'))
+            end = m.end()
+        scanned = end
+        if paragraph_chars >= min_chars: break
+    return bytes(buf)
+
+def download_html(url, max_bytes=MAX_CONTENT_BYTES):
+    """
+    Downloads an article page for deep fetch: the body is streamed and read only
+    up to `max_bytes` or until enough paragraph text has arrived. Returns None
+    for non-HTTP URLs, non-HTML responses and failures.
+    """
+    if not url or not url.startswith('http'):
+        return None
+    try:
+        with http_client.get(url, timeout=5, stream=True) as response:
+            response.raise_for_status()
+            with instrument.phase('download'):
+                markup = read_html_capped(response, max_bytes)
+    except Exception:
+        return None
+    if markup:
+        instrument.add(bytes=len(markup))
+    return markup or None
 
-def fetch_url_content(url):
+def fetch_url_content(url, max_bytes=MAX_CONTENT_BYTES):
     """
     Fetches the content of a URL and extracts text from paragraphs.
     Truncates to 3000 characters.
     """
-    if not url or not url.startswith('http'):
+    markup = download_html(url, max_bytes)
+    if not markup:
         return ""
+    from extraction import extract_content
     try:
-        response = requests.get(url, headers=HEADERS, timeout=5)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-         # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header"]):
-            script.extract()
-        # Get text
-        text = soup.get_text(separator=' ', strip=True)
-        # Simple cleanup
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        return text[:3000]
+        # Text of the page's main content block (boilerplate and link lists dropped, see readability)
+        with instrument.phase('parse'):
+            return extract_content(markup, CONTENT_CHARS)
     except Exception:
         return ""
 
-def enrich_items_with_content(items, max_workers=10):
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_item = {executor.submit(fetch_url_content, item['url']): item for item in items}
-        for future in concurrent.futures.as_completed(future_to_item):
-            item = future_to_item[future]
-            try:
-                content = future.result()
-                if content:
-                    item['content'] = content
-            except Exception:
-                item['content'] = ""
-    return items
+def enrich_items_with_content(items, max_workers=10, store=None, on_item=None, max_bytes=MAX_CONTENT_BYTES,
+                              scheduler=None, extract_workers=None):
+    """
+    Adds a `content` field to each item. With a ContentStore, URLs already
+    fetched within its expiry are served from it and only new URLs are downloaded.
+    `on_item` is called with each item as soon as its content is settled.
+    Downloads go through a HostScheduler (`scheduler`, or a default one).
+    Text extraction runs in an ExtractionPool of `extract_workers` processes
+    (None: automatic for MIN_POOL_PAGES pages or more, 0: in the download threads).
+    """
+    known = store.get_many([item['url'] for item in items]) if store else {}
+    to_fetch = {}
+    for item in items:
+        key = canonical_url(item['url'])
+        if key in known:
+            item['content'] = known[key]
+            if on_item: on_item(item)
+        else:
+            to_fetch.setdefault(key, []).append(item)
+    if store:
+        sys.stderr.write(f"Content store: {len(items) - sum(map(len, to_fetch.values()))} cached, {len(to_fetch)} to fetch\n")
 
-# --- Source Fetchers ---
+    # Per-host concurrency and rate limits keep one crowded host (github.com, s.weibo.com) from being throttled
+    scheduler = scheduler or HostScheduler(max_workers=max_workers)
+    fetched = []
+    tasks = [(group[0]['url'], group) for group in to_fetch.values()]
 
-def fetch_hackernews(limit=5, keyword=None):
-    base_url = "https://news.ycombinator.com"
-    news_items = []
-    page = 1
-    max_pages = 5
-    
-    while len(news_items) < limit and page <= max_pages:
-        url = f"{base_url}/news?p={page}"
-        try:
-            response = requests.get(url, headers=HEADERS, timeout=10)
-            if response.status_code != 200: break
-        except: break
+    def settle(group, content):
+        for item in group: item['content'] = content
+        if content: fetched.append((group[0]['url'], content))
+        if on_item:
+            for item in group: on_item(item)
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        rows = soup.select('.athing')
-        if not rows: break
-        
-        page_items = []
-        for row in rows:
+    import concurrent.futures
+    from extraction import MIN_POOL_PAGES, ExtractionPool
+    if extract_workers is None:
+        extract_workers = 0 if len(tasks) < MIN_POOL_PAGES or (os.cpu_count() or 1) < 2 else None
+    if extract_workers == 0 or not tasks:
+        def fetch(url):
+            with instrument.source('deep'):
+                return fetch_url_content(url, max_bytes)
+
+        for group, content, error in scheduler.map(fetch, tasks):
+            settle(group, "" if error is not None else content)
+    else:
+        # Two stages: threads download raw pages, worker processes extract text in batches
+        def download(url):
+            with instrument.source('deep'):
+                return download_html(url, max_bytes)
+
+        in_flight = {}
+        batch = []
+
+        def collect(future):
+            groups = in_flight.pop(future)
             try:
-                id_ = row.get('id')
-                title_line = row.select_one('.titleline a')
-                if not title_line: continue
-                title = title_line.get_text()
-                link = title_line.get('href')
-                
-                # Metadata
-                score_span = soup.select_one(f'#score_{id_}')
-                score = score_span.get_text() if score_span else "0 points"
-                
-                # Age/Time
-                age_span = soup.select_one(f'.age a[href="item?id={id_}"]')
-                time_str = age_span.get_text() if age_span else ""
-                
-                if link and link.startswith('item?id='): link = f"{base_url}/{link}"
-                
-                page_items.append({
-                    "source": "Hacker News", 
-                    "title": title, 
-                    "url": link, 
-                    "heat": score,
-                    "time": time_str
-                })
-            except: continue
-        
-        news_items.extend(filter_items(page_items, keyword))
-        if len(news_items) >= limit: break
-        page += 1
-        time.sleep(0.5)
-
-    return news_items[:limit]
-
-def fetch_weibo(limit=5, keyword=None):
-    # Use the PC Ajax API which returns JSON directly and is less rate-limited than scraping s.weibo.com
-    url = "https://weibo.com/ajax/side/hotSearch"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Referer": "https://weibo.com/"
-    }
-    
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        data = response.json()
-        items = data.get('data', {}).get('realtime', [])
-        
-        all_items = []
-        for item in items:
-            # key 'note' is usually the title, sometimes 'word'
-            title = item.get('note', '') or item.get('word', '')
-            if not title: continue
-            
-            # 'num' is the heat value
-            heat = item.get('num', 0)
-            
-            # Construct URL (usually search query)
-            # Web UI uses: https://s.weibo.com/weibo?q=%23TITLE%23&Refer=top
-            full_url = f"https://s.weibo.com/weibo?q={requests.utils.quote(title)}&Refer=top"
-            
-            all_items.append({
-                "source": "Weibo Hot Search", 
-                "title": title, 
-                "url": full_url, 
-                "heat": f"{heat}",
-                "time": "Real-time"
-            })
-            
-        return filter_items(all_items, keyword)[:limit]
-    except Exception: 
-        return []
+                results = future.result()
+            except Exception:
+                results = [("", 0.0)] * len(groups)
+            for group, (content, seconds) in zip(groups, results):
+                instrument.add('deep', parse=seconds)
+                settle(group, content)
 
-def fetch_github(limit=5, keyword=None):
-    try:
-        response = requests.get("https://github.com/trending", headers=HEADERS, timeout=10)
-    except: return []
-    
-    soup = BeautifulSoup(response.text, 'html.parser')
-    items = []
-    for article in soup.select('article.Box-row'):
-        try:
-            h2 = article.select_one('h2 a')
-            if not h2: continue
-            title = h2.get_text(strip=True).replace('\n', '').replace(' ', '')
-            link = "https://github.com" + h2['href']
-            
-            desc = article.select_one('p')
-            desc_text = desc.get_text(strip=True) if desc else ""
-            
-            # Stars (Heat)
-            # usually the first 'Link--muted' with a SVG star
-            stars_tag = article.select_one('a[href$="/stargazers"]')
-            stars = stars_tag.get_text(strip=True) if stars_tag else ""
-            
-            items.append({
-                "source": "GitHub Trending", 
-                "title": f"{title} - {desc_text}", 
-                "url": link,
-                "heat": f"{stars} stars",
-                "time": "Today"
-            })
-        except: continue
-    return filter_items(items, keyword)[:limit]
-
-def fetch_36kr(limit=5, keyword=None):
-    try:
-        response = requests.get("https://36kr.com/newsflashes", headers=HEADERS, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        items = []
-        for item in soup.select('.newsflash-item'):
-            title = item.select_one('.item-title').get_text(strip=True)
-            href = item.select_one('.item-title')['href']
-            time_tag = item.select_one('.time')
-            time_str = time_tag.get_text(strip=True) if time_tag else ""
-            
-            items.append({
-                "source": "36Kr", 
-                "title": title, 
-                "url": f"https://36kr.com{href}" if not href.startswith('http') else href,
-                "time": time_str,
-                "heat": ""
-            })
-        return filter_items(items, keyword)[:limit]
-    except: return []
-
-def fetch_v2ex(limit=5, keyword=None):
-    try:
-        # Hot topics json
-        data = requests.get("https://www.v2ex.com/api/topics/hot.json", headers=HEADERS, timeout=10).json()
-        items = []
-        for t in data:
-            # V2EX API fields: created, replies (heat)
-            replies = t.get('replies', 0)
-            created = t.get('created', 0)
-            # convert epoch to readable if possible, simpler to just leave as is or basic format
-            # Let's keep it simple
-            items.append({
-                "source": "V2EX", 
-                "title": t['title'], 
-                "url": t['url'],
-                "heat": f"{replies} replies",
-                "time": "Hot"
-            })
-        return filter_items(items, keyword)[:limit]
-    except: return []
-
-def fetch_tencent(limit=5, keyword=None):
-    try:
-        url = "https://i.news.qq.com/web_backend/v2/getTagInfo?tagId=aEWqxLtdgmQ%3D"
-        data = requests.get(url, headers={"Referer": "https://news.qq.com/"}, timeout=10).json()
-        items = []
-        for news in data['data']['tabs'][0]['articleList']:
-            items.append({
-                "source": "Tencent News", 
-                "title": news['title'], 
-                "url": news.get('url') or news.get('link_info', {}).get('url'),
-                "time": news.get('pub_time', '') or news.get('publish_time', '')
-            })
-        return filter_items(items, keyword)[:limit]
-    except: return []
-
-def fetch_wallstreetcn(limit=5, keyword=None):
-    try:
-        url = "https://api-one.wallstcn.com/apiv1/content/information-flow?channel=global-channel&accept=article&limit=30"
-        data = requests.get(url, timeout=10).json()
-        items = []
-        for item in data['data']['items']:
-            res = item.get('resource')
-            if res and (res.get('title') or res.get('content_short')):
-                 ts = res.get('display_time', 0)
-                 time_str = datetime.fromtimestamp(ts).strftime('%H:%M') if ts else ""
-                 items.append({
-                     "source": "Wall Street CN", 
-                     "title": res.get('title') or res.get('content_short'), 
-                     "url": res.get('uri'),
-                     "time": time_str
-                 })
-        return filter_items(items, keyword)[:limit]
-    except: return []
-
-def fetch_producthunt(limit=5, keyword=None):
-    try:
-        # Using RSS for speed and reliability without API key
-        response = requests.get("https://www.producthunt.com/feed", headers=HEADERS, timeout=10)
-        soup = BeautifulSoup(response.text, 'xml')
-        if not soup.find('item'): soup = BeautifulSoup(response.text, 'html.parser')
-        
-        items = []
-        for entry in soup.find_all(['item', 'entry']):
-            title = entry.find('title').get_text(strip=True)
-            link_tag = entry.find('link')
-            url = link_tag.get('href') or link_tag.get_text(strip=True) if link_tag else ""
-            
-            pubBox = entry.find('pubDate') or entry.find('published')
-            pub = pubBox.get_text(strip=True) if pubBox else ""
-            
-            items.append({
-                "source": "Product Hunt", 
-                "title": title, 
-                "url": url,
-                "time": pub,
-                "heat": "Top Product" # RSS implies top rank
-            })
-        return filter_items(items, keyword)[:limit]
-    except: return []
+        with ExtractionPool(extract_workers) as pool:
+            for group, markup, error in scheduler.map(download, tasks):
+                if error is not None or not markup:
+                    settle(group, "")
+                    continue
+                batch.append((group, markup))
+                if len(batch) >= pool.batch_size:
+                    in_flight[pool.submit([m for _, m in batch], CONTENT_CHARS)] = [g for g, _ in batch]
+                    batch = []
+                for future in [f for f in in_flight if f.done()]:
+                    collect(future)
+            if batch:
+                in_flight[pool.submit([m for _, m in batch], CONTENT_CHARS)] = [g for g, _ in batch]
+            for future in concurrent.futures.as_completed(list(in_flight)):
+                collect(future)
+    instrument.add('deep', items=len(fetched))
+    if store:
+        store.put_many(fetched)
+        store.prune()
+    return items
+
+def with_summaries(deep):
+    """
+    Wraps a deep-fetch stage so every batch it enriches is summarised as a
+    whole (see summarise.py) before its items are handed to `on_item`.
+    """
+    from summarise import estimate_tokens, summarise_items
+
+    def run(items, on_item=None):
+        items = summarise_items(deep(items))
+        before = sum(estimate_tokens(item.get('content')) for item in items)
+        after = sum(item.get('summary_tokens', 0) for item in items)
+        if after:
+            sys.stderr.write(f"Summaries: ~{before} content tokens -> ~{after} summary tokens ({before / after:.1f}x)\n")
+        if on_item:
+            for item in items: on_item(item)
+        return items
+    return run
 
 def main():
     parser = argparse.ArgumentParser()
-    sources_map = {
-        'hackernews': fetch_hackernews, 'weibo': fetch_weibo, 'github': fetch_github,
-        '36kr': fetch_36kr, 'v2ex': fetch_v2ex, 'tencent': fetch_tencent,
-        'wallstreetcn': fetch_wallstreetcn, 'producthunt': fetch_producthunt
-    }
     
     parser.add_argument('--source', default='all', help='Source(s) to fetch from (comma-separated)')
     parser.add_argument('--limit', type=int, default=10, help='Limit per source. Default 10')
+    parser.add_argument('--top', type=int, help='Return only the N hottest items across all sources (by per-source heat z-score)')
     parser.add_argument('--keyword', help='Comma-sep keyword filter')
+    parser.add_argument('--since', help='Only items newer than this: a duration ("1h", "30m", "2d") or a date/time ("2026-02-05T18:00")')
+    parser.add_argument('--exclude', help='Comma-sep keywords; items whose title contains any are dropped')
     parser.add_argument('--deep', action='store_true', help='Download article content for detailed summarization')
+    parser.add_argument('--summary', action='store_true', help='With --deep, add an extractive `summary` (about 1/5 of the content) and its `summary_tokens` estimate. Needs numpy')
+    parser.add_argument('--max-content-kb', type=int, default=1024, help='Per-URL download cap in KB for --deep. Default 1024')
+    parser.add_argument('--extract-workers', type=int, help='Processes extracting --deep article text (0: extract in the download threads). Default: automatic')
+    parser.add_argument('--no-dedup', action='store_true', help='Keep duplicate stories reported by several sources')
+    parser.add_argument('--watch', action='store_true', help='Keep running, poll each source adaptively and stream only new/changed items as NDJSON')
+    parser.add_argument('--serve', metavar='ADDR', help='Keep running and answer HTTP queries from in-memory snapshots on ADDR ("127.0.0.1:8765", ":8765" or "unix:/path/news.sock"); see scripts/server.py')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help='json: one array at the end; ndjson: stream one item per line. Default json')
+    parser.add_argument('--timeout', type=float, default=20, help='Global deadline in seconds for all sources. Default 20')
+    parser.add_argument('--source-timeout', type=float, default=15, help='Deadline in seconds for each source. Default 15')
+    parser.add_argument('--parser', help='HTML parser backend, globally ("lxml") or per source ("github=lxml,36kr=html.parser")')
+    parser.add_argument('--pool-size', type=int, default=10, help='Keep-alive connections per host. Default 10')
+    parser.add_argument('--retries', type=int, default=2, help='Retries for transient HTTP errors (jittered backoff). Default 2')
+    parser.add_argument('--no-breaker', action='store_true', help='Disable the per-source circuit breaker')
+    parser.add_argument('--breaker-threshold', type=int, default=3, help='Consecutive failed runs before a source is skipped. Default 3')
+    parser.add_argument('--breaker-cooldown', type=float, default=600, help='Seconds a tripped source is skipped. Default 600')
+    parser.add_argument('--record', metavar='DIR', help='Save every raw HTTP response into DIR as replay fixtures')
+    parser.add_argument('--replay', metavar='DIR', help='Serve HTTP responses from fixtures recorded with --record (no network)')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the on-disk response cache')
+    parser.add_argument('--refresh', action='store_true', help='Ignore cached responses but store fresh ones')
+    parser.add_argument('--cache-ttl', help='Per-source freshness TTL overrides, e.g. "github=7200,weibo=30"')
+    parser.add_argument('--cache-size', type=int, default=50, help='Response cache size cap in MB. Default 50')
+    parser.add_argument('--per-host', type=int, default=2, help='Max concurrent deep-fetch requests per host. Default 2')
+    parser.add_argument('--host-rate', type=float, default=2.0, help='Max deep-fetch requests per second per host (0: unlimited). Default 2')
+    parser.add_argument('--content-ttl', type=float, default=168, help='Hours a deep-fetched article stays in the content store. Default 168')
+    parser.add_argument('--stats', action='store_true', help='Write per-source DNS/connect/TLS/TTFB/download/parse timings, bytes and item counts to stderr as JSON')
+    parser.add_argument('--prom-file', metavar='PATH', help='Also write those per-source stats as a Prometheus textfile')
+    parser.add_argument('--history', action='store_true', help='Append this run to the searchable history store (see scripts/history.py)')
+    parser.add_argument('--history-db', metavar='PATH', help='History database. Default: history.db in the cache directory')
     
     args = parser.parse_args()
+    if args.top is not None and (args.watch or args.top < 1):
+        parser.error('--top needs a positive N and cannot be combined with --watch')
+    if args.per_host < 1:
+        parser.error('--per-host must be at least 1')
+    if args.host_rate < 0:
+        parser.error('--host-rate must not be negative (0 means unlimited)')
+    if args.retries < 0:
+        parser.error('--retries must not be negative')
+    if args.extract_workers is not None and args.extract_workers < 0:
+        parser.error('--extract-workers must not be negative (0 extracts in the download threads)')
+    if args.serve and args.watch:
+        parser.error('--serve and --watch are separate modes')
+    if args.serve:
+        from server import parse_address
+        try:
+            parse_address(args.serve)
+        except ValueError as e:
+            parser.error(f'--serve: {e}')
+    since = None
+    if args.since:
+        try:
+            since = parse_since(args.since)
+        except ValueError:
+            parser.error(f'--since: cannot parse {args.since!r}')
+    http_client.configure(pool_maxsize=args.pool_size, retries=args.retries)
+    if args.record or args.replay:
+        # Fixtures must see every request and replay must be deterministic: no caches, breaker or retries
+        args.no_cache = args.no_breaker = True
+        from replay import RecordingAdapter, ReplayAdapter
+        if args.record:
+            http_client.configure(adapter=RecordingAdapter(args.record, pool_maxsize=args.pool_size))
+        else:
+            http_client.configure(adapter=ReplayAdapter(args.replay), retries=0)
+    if args.stats or args.prom_file:
+        instrument.enable()
+        # Connection-level timings need the instrumented transport; record/replay keep their own
+        if not (args.record or args.replay):
+            http_client.configure(adapter=instrument.InstrumentedAdapter(pool_connections=16, pool_maxsize=args.pool_size))
+    if args.parser:
+        try:
+            import html_parser
+        except ImportError as e:
+            parser.error(f'--parser: {e}')
+        for pair in args.parser.split(','):
+            name, _, backend = pair.rpartition('=')
+            if name.strip() and name.strip() not in SOURCES:
+                parser.error(f'--parser: unknown source {name.strip()!r}')
+            try:
+                html_parser.set_backend(backend.strip(), source=name.strip() or None)
+            except ValueError as e:
+                parser.error(f'--parser: {e}')
+    if args.cache_ttl:
+        for pair in args.cache_ttl.split(','):
+            name, _, seconds = (part.strip() for part in pair.partition('='))
+            if name not in CACHE_TTLS:
+                parser.error(f'--cache-ttl: unknown source {name!r}')
+            try:
+                CACHE_TTLS[name] = float(seconds)
+            except ValueError:
+                parser.error(f'--cache-ttl: {name} needs a number of seconds, got {seconds!r}')
+    if not args.no_cache:
+        http_client.set_cache(ResponseCache(max_bytes=args.cache_size * 1024 * 1024, refresh=args.refresh))
     
     to_run = []
     if args.source == 'all':
-        to_run = list(sources_map.values())
+        to_run = list(SOURCES)
     else:
         requested_sources = [s.strip() for s in args.source.split(',')]
         for s in requested_sources:
-            if s in sources_map: to_run.append(sources_map[s])
+            if s in SOURCES and s not in to_run: to_run.append(s)
+
+    # Source modules are imported here, before the fan-out, and only for the requested sources
+    fetchers = {}
+    for name in to_run:
+        try:
+            fetchers[name] = load_source(name)
+        except ImportError as e:
+            sys.stderr.write(f"Skipping {name}: {e}\n")
+    to_run = [name for name in to_run if name in fetchers]
             
-    results = []
-    for func in to_run:
+    matcher = KeywordMatcher.compile(args.keyword, args.exclude) or None
+    # Heat and time are normalised per source batch, so z-scores compare across sources
+    jobs = {name: (lambda name=name, f=fetchers[name]: instrument.run_source(
+                name, lambda: normalise(f(args.limit, matcher, since() if since else None))))
+            for name in to_run}
+    deep, hosts = None, None
+    if args.deep or args.serve:
+        from content_store import ContentStore
+        store = None if args.no_cache else ContentStore(ttl=args.content_ttl * 3600, refresh=args.refresh)
+        hosts = HostScheduler(per_host=args.per_host, rate=args.host_rate)
+        deep = functools.partial(enrich_items_with_content, store=store, scheduler=hosts,
+                                 max_bytes=args.max_content_kb * 1024, extract_workers=args.extract_workers)
+    if args.summary:
+        if not deep:
+            parser.error('--summary needs --deep')
         try:
-            results.extend(func(args.limit, args.keyword))
-        except: pass
+            deep = with_summaries(deep)
+        except ImportError as e:
+            parser.error(f'--summary needs numpy (pip install numpy): {e}')
+
+    history = None
+    if args.history:
+        from history import HistoryStore
+        history = HistoryStore(args.history_db)
+
+    breaker = None
+    if not args.no_breaker:
+        breaker = CircuitBreaker(threshold=args.breaker_threshold, cooldown=args.breaker_cooldown)
+
+    if args.serve:
+        # Queries pick their own sources, limit, keyword and deep; the snapshots are fetched unfiltered
+        from server import serve
+        serve(args.serve, fetchers, deep=deep, source_timeout=args.source_timeout)
+        return
+
+    if args.watch:
+        from watch import watch
+
+        def process(items):
+            if not args.no_dedup: items = dedup_items(items)
+            if deep: items = deep(items)
+            if history: history.add_items(history.begin_run(label='watch'), items)
+            return items
+        watch(jobs, {name: CACHE_TTLS[name] for name in jobs}, write_line, process=process,
+              source_deadline=args.source_timeout, breaker=breaker, on_poll=lambda: report_stats(args))
+        return
+
+    if args.format == 'ndjson':
+        stream_ndjson(jobs, args, deep, breaker, history)
+        report_host_stats(hosts)
+        report_stats(args)
+        return
+
+    if args.top:
+        results = fetch_top(jobs, args, breaker)
+    else:
+        by_source, status = fetch_sources(jobs, args, breaker)
+        results = []
+        for name in to_run:
+            results.extend(by_source.get(name, []))
+    if not args.no_dedup and results and not args.top:
+        total = len(results)
+        results = dedup_items(results)
+        if total > len(results):
+            sys.stderr.write(f"Collapsed {total - len(results)} duplicate items across sources\n")
         
     if args.deep and results:
         sys.stderr.write(f"Deep fetching content for {len(results)} items...\n")
-        results = enrich_items_with_content(results)
+        results = deep(results)
+        report_host_stats(hosts)
+    report_stats(args)
+    if history and results:
+        history.add_items(history.begin_run(label='fetch_news'), results)
         
     print(json.dumps(results, indent=2, ensure_ascii=False))
 
+_stdout_lock = threading.Lock()
+
+def write_line(record):
+    line = json.dumps(record, ensure_ascii=False)
+    with _stdout_lock:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+def fetch_sources(jobs, args, breaker=None, on_result=None):
+    """
+    Runs the source jobs concurrently, skipping sources whose circuit is open
+    and recording the outcome of the others. Writes the per-source status
+    ({"status": "ok" | "error" | "timeout" | "skipped", ...}) to stderr as JSON.
+    """
+    skipped = {}
+    if breaker: jobs, skipped = breaker.filter_jobs(jobs)
+    results, status = run_sources(jobs, deadline=args.timeout, source_deadline=args.source_timeout,
+                                  on_result=on_result)
+    if breaker:
+        breaker.record_status(status)
+        breaker.save()
+    status.update(skipped)
+    sys.stderr.write(f"Source status: {json.dumps(status, ensure_ascii=False)}\n")
+    return results, status
+
+def fetch_top(jobs, args, breaker=None):
+    """
+    Merges each source's items into a TopK heap as the source finishes (after
+    dropping duplicates of items already seen), so only `args.top` items are
+    kept; returns them hottest first.
+    """
+    top = TopK(args.top)
+    index = None if args.no_dedup else Deduplicator()
+
+    def on_result(name, items):
+        for item in items:
+            if index is None or index.add(item) is None:
+                top.push(item)
+
+    fetch_sources(jobs, args, breaker, on_result=on_result)
+    return top.items()
+
+def report_host_stats(hosts):
+    if hosts and hosts.stats():
+        sys.stderr.write(f"Deep fetch per-host stats: {json.dumps(hosts.stats())}\n")
+
+def report_stats(args):
+    if not instrument.enabled():
+        return
+    if args.stats:
+        sys.stderr.write(f"Source stats: {json.dumps(instrument.snapshot())}\n")
+    if args.prom_file:
+        instrument.write_prometheus(args.prom_file)
+
+def stream_ndjson(jobs, args, deep=None, breaker=None, history=None):
+    """
+    Writes one JSON object per line as soon as each source finishes (or, with
+    --deep, as soon as each item's content is fetched), then a final
+    {"type": "summary", ...} record. Nothing is buffered across sources; with a
+    HistoryStore each item is recorded as it is written. With --top only the
+    TopK heap is kept and its items are written once every source is done.
+    If deep fetch fails for a batch, its remaining items are written without
+    content and the error is recorded in their sources' status.
+    """
+    started = time.monotonic()
+    counts = {}
+    # Later copies of a story already streamed are dropped (they cannot be merged into a written line)
+    index = None if args.no_dedup else Deduplicator()
+    duplicates = 0
+    top = TopK(args.top) if args.top else None
+
+    run_id = history.begin_run(label='fetch_news') if history else None
+
+    emitted = set()
+
+    def emit(item):
+        emitted.add(id(item))
+        write_line(item)
+        if history: history.add_items(run_id, [item])
+        with _stdout_lock:
+            counts[item.get('source')] = counts.get(item.get('source'), 0) + 1
+
+    # Deep fetch runs as a single pipeline stage behind the sources, one source batch at a time
+    import concurrent.futures
+    deep_stage = concurrent.futures.ThreadPoolExecutor(max_workers=1) if deep else None
+    batches = []  # (items, future) per deep-fetch batch
+    source_of = {}  # id(item) -> source name, for status
+
+    def on_result(name, items):
+        nonlocal duplicates
+        if index:
+            fresh = [item for item in items if index.add(item) is None]
+            duplicates += len(items) - len(fresh)
+            items = fresh
+        for item in items: source_of[id(item)] = name
+        if top:
+            top.extend(items)
+        elif deep_stage:
+            batches.append((items, deep_stage.submit(deep, items, on_item=emit)))
+        else:
+            for item in items: emit(item)
+
+    _, status = fetch_sources(jobs, args, breaker, on_result=on_result)
+    if top:
+        if deep_stage: batches.append((top.items(), deep_stage.submit(deep, top.items(), on_item=emit)))
+        else:
+            for item in top.items(): emit(item)
+    if deep_stage:
+        deep_stage.shutdown(wait=True)
+    for items, future in batches:
+        error = future.exception()
+        if error is None:
+            continue
+        names = sorted({source_of[id(item)] for item in items})
+        sys.stderr.write(f"Deep fetch failed for {', '.join(names)}: {error!r}\n")
+        for name in names:
+            status.setdefault(name, {}).update(deep='error', deep_reason=repr(error))
+        for item in items:
+            if id(item) not in emitted:
+                item.setdefault('content', '')
+                emit(item)
+
+    summary = {
+        "type": "summary",
+        "count": sum(counts.values()),
+        "counts": counts,
+        "duplicates": duplicates,
+        "sources": status,
+        "elapsed": round(time.monotonic() - started, 3),
+    }
+    write_line(summary)
+
 if __name__ == "__main__":
     main()
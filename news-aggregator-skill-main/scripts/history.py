@@ -0,0 +1,282 @@
+"""
+Indexed history of past news runs.
+
+Every run (a `fetch_news.py --history` invocation, or a JSON/NDJSON dump
+ingested from `reports/`) is appended to a local SQLite database. A story is
+stored once per canonical URL with its first/last sighting; each run that saw
+it adds a row to `sightings`. Titles and text (deep content, report summaries)
+are indexed with FTS5, and stories are indexed by source and last sighting, so
+"everything mentioning X in the last 7 days" is one indexed query instead of a
+rescan of every dump.
+
+CJK text is indexed as character bigrams (the same tokens `dedup` uses), so
+Chinese terms match inside longer Chinese titles; English is tokenised by
+FTS5's unicode61 tokenizer.
+
+Usage:
+    python scripts/history.py ingest reports/*.json
+    python scripts/history.py search "DeepSeek,芯片" --days 7 --source "Hacker News"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+from http_cache import CACHE_DIR
+from urls import canonical_url
+
+_CJK = re.compile(r"[㐀-䶿一-鿿豈-﫿]+")
+_REPORT_STAMP = re.compile(r"(\d{8})_(\d{4})(\d{2})?")
+
+
+def fts_text(text):
+    """Lower-cases `text` and splits CJK runs into space-separated bigrams for the FTS index."""
+    def bigrams(match):
+        run = match.group()
+        if len(run) == 1:
+            return f" {run} "
+        return " " + " ".join(run[i:i + 2] for i in range(len(run) - 1)) + " "
+    return _CJK.sub(bigrams, (text or "").lower())
+
+
+def fts_query(terms):
+    """
+    Builds an FTS5 MATCH expression from comma-separated `terms`: each term is a
+    phrase, terms are OR-ed. A single CJK character becomes a prefix query.
+    """
+    phrases = []
+    for term in terms.split(","):
+        tokens = fts_text(term).split()
+        if not tokens:
+            continue
+        if len(tokens) == 1 and _CJK.fullmatch(tokens[0]) and len(tokens[0]) == 1:
+            phrases.append(f'"{tokens[0]}" *')
+            continue
+        phrases.append('"' + " ".join(t.replace('"', '""') for t in tokens) + '"')
+    return " OR ".join(phrases)
+
+
+def item_text(item):
+    """Searchable body of an item: deep content, or a report's summary and analysis strings."""
+    parts = []
+
+    def collect(value):
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, dict):
+            for v in value.values(): collect(v)
+        elif isinstance(value, list):
+            for v in value: collect(v)
+
+    for field in ("content", "summary", "deep_analysis"):
+        collect(item.get(field))
+    return "\n".join(p for p in parts if p)
+
+
+def load_dump(path):
+    """Items of a fetch_news JSON array, NDJSON stream or report dict (`topics`/`items`)."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(data, dict):
+        data = data.get("topics") or data.get("items") or []
+    return [item for item in data if isinstance(item, dict) and item.get("title") and item.get("type") != "summary"]
+
+
+def dump_time(path):
+    """Run time from a report filename stamp (`..._20260205_185400.json`), else the file's mtime."""
+    match = _REPORT_STAMP.search(os.path.basename(path))
+    if match:
+        try:
+            return datetime.strptime(match.group(1) + match.group(2) + (match.group(3) or "00"),
+                                     "%Y%m%d%H%M%S").timestamp()
+        except ValueError:
+            pass
+    return os.path.getmtime(path)
+
+
+class HistoryStore:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(CACHE_DIR, "history.db")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY,
+                origin TEXT UNIQUE,
+                label TEXT,
+                run_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS stories (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                url TEXT,
+                source TEXT,
+                title TEXT NOT NULL,
+                heat TEXT,
+                time TEXT,
+                content TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sightings (
+                story_id INTEGER NOT NULL,
+                run_id INTEGER NOT NULL,
+                seen_at REAL NOT NULL,
+                heat TEXT,
+                PRIMARY KEY (story_id, run_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS stories_last_seen ON stories(last_seen);
+            CREATE INDEX IF NOT EXISTS stories_source ON stories(source COLLATE NOCASE, last_seen);
+            CREATE INDEX IF NOT EXISTS stories_url ON stories(url);
+            CREATE INDEX IF NOT EXISTS sightings_seen_at ON sightings(seen_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS stories_fts USING fts5(title, content, tokenize='unicode61 remove_diacritics 2');
+        """)
+        self._db.commit()
+
+    def begin_run(self, label=None, run_at=None, origin=None):
+        """Registers a run; returns its id, or None if `origin` was already ingested."""
+        with self._lock:
+            cursor = self._db.execute("INSERT OR IGNORE INTO runs (origin, label, run_at) VALUES (?, ?, ?)",
+                                      (origin, label, run_at or time.time()))
+            self._db.commit()
+            return cursor.lastrowid if cursor.rowcount else None
+
+    def add_items(self, run_id, items):
+        """Records `items` as seen in run `run_id`, creating or refreshing their stories."""
+        with self._lock:
+            run_at = self._db.execute("SELECT run_at FROM runs WHERE id = ?", (run_id,)).fetchone()[0]
+            for item in items:
+                self._add(run_id, run_at, item)
+            self._db.commit()
+
+    def _add(self, run_id, run_at, item):
+        title = str(item.get("title") or "")
+        source = item.get("source") or ""
+        key = canonical_url(item.get("url")) or f"title:{source}:{title}"
+        heat = None if item.get("heat") is None else str(item["heat"])
+        text = item_text(item)
+        row = self._db.execute("SELECT id, title, content, first_seen, last_seen FROM stories WHERE key = ?",
+                               (key,)).fetchone()
+        if row is None:
+            story_id = self._db.execute(
+                "INSERT INTO stories (key, url, source, title, heat, time, content, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, item.get("url"), source, title, heat, item.get("time"), text, run_at, run_at)).lastrowid
+            self._db.execute("INSERT INTO stories_fts (rowid, title, content) VALUES (?, ?, ?)",
+                             (story_id, fts_text(title), fts_text(text)))
+        else:
+            story_id, old_title, old_text, first_seen, last_seen = row
+            latest = run_at >= last_seen
+            if latest:
+                self._db.execute("UPDATE stories SET title = ?, heat = ?, time = ?, last_seen = ? WHERE id = ?",
+                                 (title, heat, item.get("time"), run_at, story_id))
+            if run_at < first_seen:
+                self._db.execute("UPDATE stories SET first_seen = ? WHERE id = ?", (run_at, story_id))
+            if text and not old_text:
+                self._db.execute("UPDATE stories SET content = ? WHERE id = ?", (text, story_id))
+            new_title, new_text = (title if latest else old_title), (old_text or text)
+            if (new_title, new_text) != (old_title, old_text):
+                self._db.execute("DELETE FROM stories_fts WHERE rowid = ?", (story_id,))
+                self._db.execute("INSERT INTO stories_fts (rowid, title, content) VALUES (?, ?, ?)",
+                                 (story_id, fts_text(new_title), fts_text(new_text)))
+        self._db.execute("INSERT OR IGNORE INTO sightings (story_id, run_id, seen_at, heat) VALUES (?, ?, ?, ?)",
+                         (story_id, run_id, run_at, heat))
+
+    def ingest(self, path):
+        """Appends a dump file as one run; returns the number of items, or None if it was already ingested."""
+        with open(path, "rb") as f:
+            origin = "sha1:" + hashlib.sha1(f.read()).hexdigest()
+        items = load_dump(path)
+        run_id = self.begin_run(label=os.path.basename(path), run_at=dump_time(path), origin=origin)
+        if run_id is None:
+            return None
+        self.add_items(run_id, items)
+        return len(items)
+
+    def search(self, terms=None, since=None, source=None, limit=50):
+        """
+        Stories matching `terms` (see `fts_query`) last seen at or after `since`
+        (epoch seconds), optionally from one source, newest first.
+        """
+        columns = ("s.source, s.title, s.url, s.heat, s.time, s.first_seen, s.last_seen, "
+                   "(SELECT COUNT(*) FROM sightings WHERE story_id = s.id) AS sightings")
+        where, params = ["s.last_seen >= ?"], [since or 0]
+        if source:
+            where.append("s.source = ? COLLATE NOCASE")
+            params.append(source)
+        if terms and fts_query(terms):
+            sql = (f"SELECT {columns} FROM stories_fts JOIN stories s ON s.id = stories_fts.rowid "
+                   "WHERE stories_fts MATCH ? AND " + " AND ".join(where))
+            params.insert(0, fts_query(terms))
+        else:
+            sql = f"SELECT {columns} FROM stories s WHERE " + " AND ".join(where)
+        sql += " ORDER BY s.last_seen DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [{
+            "source": source, "title": title, "url": url, "heat": heat, "time": time_str,
+            "first_seen": datetime.fromtimestamp(first_seen).isoformat(timespec="seconds"),
+            "last_seen": datetime.fromtimestamp(last_seen).isoformat(timespec="seconds"),
+            "sightings": sightings,
+        } for source, title, url, heat, time_str, first_seen, last_seen, sightings in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the history of past news runs")
+    parser.add_argument('--db', help='History database. Default: history.db in the cache directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help='Append JSON/NDJSON dumps (e.g. reports/*.json) as runs')
+    ingest.add_argument('paths', nargs='+')
+    search = commands.add_parser('search', help='Full-text search over titles and content')
+    search.add_argument('terms', nargs='?', help='Comma-separated terms (phrases, OR-ed); omit to list recent stories')
+    search.add_argument('--days', type=float, help='Only stories seen in the last N days')
+    search.add_argument('--since', help='Only stories seen at or after this ISO date/time')
+    search.add_argument('--source', help='Only this source (e.g. "Hacker News")')
+    search.add_argument('--limit', type=int, default=50, help='Max results. Default 50')
+    args = parser.parse_args()
+    since = None
+    if args.command == 'search' and args.since:
+        try:
+            since = datetime.fromisoformat(args.since).timestamp()
+        except ValueError:
+            search.error(f'--since: cannot parse {args.since!r} (expected an ISO date/time)')
+
+    store = HistoryStore(args.db)
+    if args.command == 'ingest':
+        for path in args.paths:
+            try:
+                count = store.ingest(path)
+            except (OSError, ValueError) as e:
+                sys.stderr.write(f"Skipping {path}: {e}\n")
+                continue
+            sys.stderr.write(f"{path}: {'already ingested' if count is None else f'{count} items'}\n")
+        return
+
+    if since is None and args.days:
+        since = time.time() - args.days * 86400
+    t0 = time.perf_counter()
+    results = store.search(args.terms, since=since, source=args.source, limit=args.limit)
+    sys.stderr.write(f"{len(results)} results in {(time.perf_counter() - t0) * 1000:.1f}ms\n")
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Pluggable HTML parsing for the news scrapers.
+
+`parse()` builds a BeautifulSoup tree with the fastest tree builder installed
+(lxml when available, the stdlib `html.parser` otherwise) and can restrict the
+tree to the subtrees a scraper actually reads via `only=` (a SoupStrainer spec),
+so the rest of the page is never materialised. `extract_text()` gives the
+whole page's visible text (deep fetch keeps only the main block, see readability).
+
+Backends can be pinned globally or per source with `set_backend()`.
+"""
+
+import importlib.util
+import warnings
+
+from bs4 import BeautifulSoup, SoupStrainer, XMLParsedAsHTMLWarning
+
+HAS_LXML = importlib.util.find_spec("lxml") is not None
+
+_backends = {None: "lxml" if HAS_LXML else "html.parser"}
+
+
+def available_backends():
+    backends = ["html.parser"]
+    if HAS_LXML: backends.append("lxml")
+    return backends
+
+
+def set_backend(backend, source=None):
+    """Pins the tree builder for `source` (or the default when source is None)."""
+    if backend not in available_backends():
+        raise ValueError(f"Parser backend not available: {backend}. Installed: {', '.join(available_backends())}")
+    _backends[source] = backend
+
+
+def backend_for(source=None):
+    return _backends.get(source) or _backends[None]
+
+
+def parse(markup, only=None, source=None, backend=None):
+    """
+    Parses `markup` into a BeautifulSoup tree. `only` restricts parsing to the
+    matching elements and their descendants; it is a dict of SoupStrainer
+    arguments, e.g. {"name": "article", "class_": "Box-row"}.
+    """
+    features = backend or backend_for(source)
+    parse_only = SoupStrainer(**only) if only else None
+    return BeautifulSoup(markup, features, parse_only=parse_only)
+
+
+def parse_xml(markup, only=None):
+    """Parses an XML feed; falls back to the HTML builder when lxml is missing."""
+    parse_only = SoupStrainer(**only) if only else None
+    if HAS_LXML:
+        return BeautifulSoup(markup, "xml", parse_only=parse_only)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", XMLParsedAsHTMLWarning)
+        return BeautifulSoup(markup, "html.parser", parse_only=parse_only)
+
+
+def extract_text(markup, drop=("script", "style", "nav", "footer", "header"), backend=None):
+    """Returns the visible text of a page with `drop` elements removed."""
+    soup = parse(markup, backend=backend)
+    for tag in soup(list(drop)):
+        tag.extract()
+    return soup.get_text(separator=" ", strip=True)
@@ -0,0 +1,185 @@
+"""
+Sources scraped from HTML or RSS pages: Hacker News, GitHub Trending, 36Kr and
+Product Hunt. Importing this module loads the HTML parsing stack (BeautifulSoup
+and its tree builders), so the registry in `sources` only imports it when one
+of these sources is requested.
+"""
+
+import http_client
+import html_parser
+import instrument
+from normalise import parse_time
+from pagination import paginate
+from sources import CACHE_TTLS, filter_items, in_window
+
+HN_BASE_URL = "https://news.ycombinator.com"
+HN_PAGE_DELAY = 0.5
+HN_MAX_PAGES = 5
+HN_PREFETCH = 3
+
+@instrument.timed('parse')
+def parse_hackernews_page(html, base_url=HN_BASE_URL):
+    """
+    Parses one HN listing page in a single walk: `.athing` story rows and their
+    `.subtext` metadata rows come back in document order from one select, the
+    subtext rows build an id -> (score, age) index and stories are joined to it.
+    The age span's title carries the post time ("2026-02-05T18:54:00 1770317640").
+    """
+    soup = html_parser.parse(html, source='hackernews')
+    stories = []
+    meta = {}
+    for node in soup.select('.athing, .subtext'):
+        if 'athing' in (node.get('class') or []):
+            stories.append(node)
+            continue
+        score_span = node.select_one('.score')
+        age_span = node.select_one('.age')
+        age_link = age_span.select_one('a') if age_span else None
+        id_ = None
+        if score_span and score_span.get('id', '').startswith('score_'):
+            id_ = score_span['id'][len('score_'):]
+        elif age_link and age_link.get('href', '').startswith('item?id='):
+            id_ = age_link['href'][len('item?id='):]
+        if id_:
+            posted = (age_span.get('title') or '').split() if age_span else []
+            timestamp = float(posted[-1]) if posted and posted[-1].isdigit() else None
+            meta[id_] = (score_span.get_text() if score_span else None,
+                         age_link.get_text() if age_link else None, timestamp)
+
+    page_items = []
+    for row in stories:
+        try:
+            title_line = row.select_one('.titleline a')
+            if not title_line: continue
+            title = title_line.get_text()
+            link = title_line.get('href')
+            score, time_str, timestamp = meta.get(row.get('id'), (None, None, None))
+            if link and link.startswith('item?id='): link = f"{base_url}/{link}"
+
+            page_items.append({
+                "source": "Hacker News", 
+                "title": title, 
+                "url": link, 
+                "heat": score or "0 points",
+                "time": time_str or "",
+                "timestamp": timestamp or parse_time(time_str)
+            })
+        except: continue
+    return page_items
+
+def fetch_hackernews(limit=5, keyword=None, since=None):
+    # Errors on page 1 propagate so the scheduler can record them; later pages fail soft
+    def fetch_page(page):
+        response = http_client.get(f"{HN_BASE_URL}/news?p={page}", ttl=CACHE_TTLS['hackernews'])
+        response.raise_for_status()
+        return parse_hackernews_page(response.text, HN_BASE_URL)
+
+    # Pages are prefetched concurrently, at most HN_PREFETCH in flight and starts HN_PAGE_DELAY apart
+    select = (lambda items: filter_items(items, keyword, since)) if keyword or since else None
+    # Deeper pages hold older stories: a page with nothing inside the window ends pagination
+    done = (lambda items: not any(in_window(item, since) for item in items)) if since else None
+    return paginate(fetch_page, limit, max_pages=HN_MAX_PAGES, prefetch=HN_PREFETCH,
+                    interval=HN_PAGE_DELAY, select=select, done=done)
+
+@instrument.timed('parse')
+def parse_github(html):
+    # Only the trending rows are parsed; the rest of the page never becomes a tree
+    soup = html_parser.parse(html, only={"name": "article", "class_": "Box-row"}, source='github')
+    items = []
+    for article in soup.select('article.Box-row'):
+        try:
+            h2 = article.select_one('h2 a')
+            if not h2: continue
+            title = h2.get_text(strip=True).replace('\n', '').replace(' ', '')
+            link = "https://github.com" + h2['href']
+            
+            desc = article.select_one('p')
+            desc_text = desc.get_text(strip=True) if desc else ""
+            
+            # Stars (Heat)
+            # usually the first 'Link--muted' with a SVG star
+            stars_tag = article.select_one('a[href$="/stargazers"]')
+            stars = stars_tag.get_text(strip=True) if stars_tag else ""
+            
+            items.append({
+                "source": "GitHub Trending", 
+                "title": f"{title} - {desc_text}", 
+                "url": link,
+                "heat": f"{stars} stars",
+                "time": "Today"
+            })
+        except: continue
+    return items
+
+def fetch_github(limit=5, keyword=None, since=None):
+    response = http_client.get("https://github.com/trending", ttl=CACHE_TTLS['github'])
+    response.raise_for_status()
+    # Trending repos have no post time, so `since` keeps them all
+    return filter_items(parse_github(response.text), keyword, since)[:limit]
+
+@instrument.timed('parse')
+def parse_36kr(html, since=None):
+    # Newsflashes are newest first: parsing stops at the first one older than `since`
+    soup = html_parser.parse(html, only={"class_": "newsflash-item"}, source='36kr')
+    items = []
+    for item in soup.select('.newsflash-item'):
+        try:
+            title = item.select_one('.item-title').get_text(strip=True)
+            href = item.select_one('.item-title')['href']
+            time_tag = item.select_one('.time')
+            time_str = time_tag.get_text(strip=True) if time_tag else ""
+            timestamp = parse_time(time_str)
+            if since and timestamp is not None and timestamp < since: break
+            
+            items.append({
+                "source": "36Kr", 
+                "title": title, 
+                "url": f"https://36kr.com{href}" if not href.startswith('http') else href,
+                "time": time_str,
+                "timestamp": timestamp,
+                "heat": ""
+            })
+        except: continue
+    return items
+
+def fetch_36kr(limit=5, keyword=None, since=None):
+    response = http_client.get("https://36kr.com/newsflashes", ttl=CACHE_TTLS['36kr'])
+    response.raise_for_status()
+    return filter_items(parse_36kr(response.text, since), keyword, since)[:limit]
+
+@instrument.timed('parse')
+def parse_producthunt(text, since=None):
+    # RSS <item> or Atom <entry>; the channel header and everything else is skipped
+    # Entries are newest first: parsing stops at the first one older than `since`
+    soup = html_parser.parse_xml(text, only={"name": ["item", "entry"]})
+    items = []
+    for entry in soup.find_all(['item', 'entry']):
+        title_tag = entry.find('title')
+        if not title_tag: continue
+        title = title_tag.get_text(strip=True)
+        link_tag = entry.find('link')
+        url = link_tag.get('href') or link_tag.get_text(strip=True) if link_tag else ""
+        # The HTML fallback builder treats <link> as a void tag, leaving the URL as its next sibling
+        if link_tag and not url and isinstance(link_tag.next_sibling, str): url = link_tag.next_sibling.strip()
+        
+        # ...and lower-cases tag names
+        pubBox = entry.find('pubDate') or entry.find('pubdate') or entry.find('published')
+        pub = pubBox.get_text(strip=True) if pubBox else ""
+        timestamp = parse_time(pub)
+        if since and timestamp is not None and timestamp < since: break
+        
+        items.append({
+            "source": "Product Hunt", 
+            "title": title, 
+            "url": url,
+            "time": pub,
+            "timestamp": timestamp,
+            "heat": "Top Product" # RSS implies top rank
+        })
+    return items
+
+def fetch_producthunt(limit=5, keyword=None, since=None):
+    # Using RSS for speed and reliability without API key
+    response = http_client.get("https://www.producthunt.com/feed", ttl=CACHE_TTLS['producthunt'])
+    response.raise_for_status()
+    return filter_items(parse_producthunt(response.text, since), keyword, since)[:limit]
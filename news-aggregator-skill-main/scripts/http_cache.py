@@ -0,0 +1,127 @@
+"""
+On-disk HTTP response cache with conditional revalidation.
+
+Each entry is one file: a JSON metadata line (url, headers, stored_at, ETag,
+Last-Modified) followed by the raw body. Entries younger than the caller's TTL
+are served without touching the network; older ones are revalidated with
+If-None-Match / If-Modified-Since. Total size is bounded, least recently used
+entries (by file mtime) are evicted first.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CACHE_DIR = os.environ.get(
+    "NEWS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "news-aggregator-skill"))
+
+
+class ResponseCache:
+    def __init__(self, directory=None, max_bytes=50 * 1024 * 1024, refresh=False):
+        """
+        `refresh` ignores stored entries on read (always hits the network) but
+        still stores the new responses.
+        """
+        self.directory = directory or os.path.join(CACHE_DIR, "http")
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".entry")
+
+    def _read(self, url):
+        try:
+            with open(self._path(url), "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        if meta.get("url") != url:
+            return None, None
+        return meta, body
+
+    def _write(self, url, meta, body):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(meta).encode("utf-8") + b"\n")
+                f.write(body)
+            os.replace(tmp, self._path(url))
+        except OSError:
+            try: os.unlink(tmp)
+            except OSError: pass
+            return
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(".entry"): continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes: break
+
+    @staticmethod
+    def _response(url, meta, body):
+        response = requests.Response()
+        response.status_code = meta.get("status", 200)
+        response.headers = CaseInsensitiveDict(meta.get("headers", {}))
+        response._content = body
+        response.url = url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    def get(self, session, url, ttl, headers=None, **kwargs):
+        """GET `url` through `session`, serving from or revalidating the cache."""
+        meta, body = (None, None) if self.refresh else self._read(url)
+        if meta is not None and time.time() - meta["stored_at"] < ttl:
+            try: os.utime(self._path(url))
+            except OSError: pass
+            return self._response(url, meta, body)
+
+        conditional = dict(headers or {})
+        if meta is not None:
+            if meta.get("etag"): conditional["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"): conditional["If-Modified-Since"] = meta["last_modified"]
+
+        response = session.get(url, headers=conditional, **kwargs)
+        if response.status_code == 304 and meta is not None:
+            meta["stored_at"] = time.time()
+            self._write(url, meta, body)
+            return self._response(url, meta, body)
+
+        if response.status_code == 200:
+            self._write(url, {
+                "url": url,
+                "status": 200,
+                "headers": {k: v for k, v in response.headers.items()
+                            if k.lower() in ("content-type", "etag", "last-modified", "date")},
+                "stored_at": time.time(),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }, response.content)
+        response.from_cache = False
+        return response
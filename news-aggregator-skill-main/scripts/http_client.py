@@ -0,0 +1,127 @@
+"""
+Shared HTTP client for the news aggregator.
+
+All fetchers go through one pooled `requests.Session`, so connections to the
+same host are kept alive across HN pages, sources and deep-fetch URLs instead
+of paying a fresh TCP+TLS handshake per request.
+"""
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from resilience import RETRY_STATUSES, backoff_delay, is_transient, retry_after
+
+# Headers for scraping to avoid basic bot detection
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+DEFAULT_TIMEOUT = 10
+
+_config = {"pool_connections": 16, "pool_maxsize": 10, "timeout": DEFAULT_TIMEOUT, "headers": HEADERS, "retries": 2,
+           "adapter": None}
+_session = None
+_cache = None
+_lock = threading.Lock()
+
+
+def configure(pool_connections=None, pool_maxsize=None, timeout=None, headers=None, retries=None, adapter=None):
+    """
+    Sets pool sizes, default timeout, default headers and the default number of
+    retries for transient failures. `pool_connections` is the number of per-host
+    pools kept, `pool_maxsize` the keep-alive connections per host. `adapter`
+    replaces the pooled transport (e.g. replay.ReplayAdapter). Resets the
+    current session so the new settings take effect.
+    """
+    global _session
+    with _lock:
+        if adapter is not None: _config["adapter"] = adapter
+        if retries is not None: _config["retries"] = max(0, retries)
+        if pool_connections is not None: _config["pool_connections"] = pool_connections
+        if pool_maxsize is not None: _config["pool_maxsize"] = pool_maxsize
+        if timeout is not None: _config["timeout"] = timeout
+        if headers is not None: _config["headers"] = headers
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = _config["adapter"] or HTTPAdapter(pool_connections=_config["pool_connections"],
+                                                            pool_maxsize=_config["pool_maxsize"])
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update(_config["headers"])
+                _session = session
+    return _session
+
+
+def set_cache(cache):
+    """Installs an http_cache.ResponseCache (or None to disable caching)."""
+    global _cache
+    _cache = cache
+
+
+def get(url, headers=None, timeout=None, ttl=None, retries=None, **kwargs):
+    """
+    GET through the shared session. `headers` are merged over the defaults.
+    With a cache installed, `ttl` (seconds) lets a stored response be reused
+    without network I/O; stale entries are revalidated conditionally.
+    Connection errors, timeouts, 429 and 5xx are retried up to `retries` times
+    with jittered backoff (honouring a numeric Retry-After).
+    """
+    timeout = timeout or _config["timeout"]
+    # Always one attempt: with none, a negative count would return None instead of a response
+    retries = _config["retries"] if retries is None else max(0, retries)
+    for attempt in range(retries + 1):
+        try:
+            if _cache is not None and ttl:
+                response = _cache.get(get_session(), url, ttl, headers=headers, timeout=timeout, **kwargs)
+            else:
+                response = get_session().get(url, headers=headers, timeout=timeout, **kwargs)
+        except Exception as e:
+            if attempt >= retries or not is_transient(e): raise
+            time.sleep(backoff_delay(attempt))
+            continue
+        if response.status_code in RETRY_STATUSES and attempt < retries:
+            delay = retry_after(response)
+            response.close()
+            time.sleep(delay if delay is not None else backoff_delay(attempt))
+            continue
+        return response
+
+
+def connection_stats():
+    """
+    Returns {host: {"connections": opened, "requests": served}} for every pool in
+    the shared session, so connection reuse can be checked against a local server.
+    """
+    stats = {}
+    if _session is None:
+        return stats
+    for adapter in set(_session.adapters.values()):
+        if not hasattr(adapter, "poolmanager"): continue
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None: continue
+            host = f"{pool.host}:{pool.port}" if pool.port else pool.host
+            entry = stats.setdefault(host, {"connections": 0, "requests": 0})
+            entry["connections"] += pool.num_connections
+            entry["requests"] += pool.num_requests
+    return stats
+
+
+def close():
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
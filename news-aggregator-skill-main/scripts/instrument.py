@@ -0,0 +1,185 @@
+"""
+Per-source timing and size instrumentation for the news aggregator.
+
+Disabled by default; `enable()` turns it on. Work is attributed to the source
+named by the innermost `source()` context (a context variable, so it follows
+work that is handed on with `contextvars.copy_context()`). HTTP timings
+come from `InstrumentedAdapter`: for every new connection DNS, TCP connect and
+TLS handshake; for every request time-to-first-byte, download time and body
+bytes. Parse time comes from functions decorated with `@timed("parse")`.
+
+DNS is measured with a separate lookup right before urllib3 connects, so the
+`connect` figure is TCP plus whatever the resolver cache answers second time.
+"""
+
+import contextvars
+import functools
+import os
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+FIELDS = ("requests", "connections", "dns", "connect", "tls", "ttfb", "download", "bytes", "parse", "total", "items")
+
+_enabled = False
+_lock = threading.Lock()
+_stats = {}
+_source = contextvars.ContextVar("instrument_source", default=None)
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def enabled():
+    return _enabled
+
+
+def add(source=None, **values):
+    """Adds `values` (FIELDS) to the current (or given) source's counters."""
+    if not _enabled:
+        return
+    source = source or _source.get() or "other"
+    with _lock:
+        entry = _stats.setdefault(source, dict.fromkeys(FIELDS, 0))
+        for key, value in values.items():
+            entry[key] += value
+
+
+@contextmanager
+def source(name):
+    """Attributes work in this context to `name`; records its total wall time."""
+    token = _source.set(name)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(name, total=time.perf_counter() - t0)
+        _source.reset(token)
+
+
+@contextmanager
+def phase(field):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(**{field: time.perf_counter() - t0})
+
+
+def timed(field):
+    """Decorator adding the call's wall time to `field` of the current source."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with phase(field):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def run_source(name, func):
+    """Calls func() as source `name`, counting the items it returns."""
+    with source(name):
+        items = func()
+        add(name, items=len(items or []))
+        return items
+
+
+def snapshot():
+    """{source: {field: value}} with seconds rounded to milliseconds."""
+    with _lock:
+        return {name: {k: (round(v, 4) if isinstance(v, float) else v) for k, v in entry.items()}
+                for name, entry in _stats.items()}
+
+
+def write_prometheus(path, prefix="news_aggregator"):
+    """Writes the counters as a Prometheus textfile (atomic replace, for node_exporter)."""
+    stats = snapshot()
+    lines = [
+        f"# HELP {prefix}_phase_seconds Time spent per source and phase.",
+        f"# TYPE {prefix}_phase_seconds gauge",
+    ]
+    for name, entry in sorted(stats.items()):
+        for field in ("dns", "connect", "tls", "ttfb", "download", "parse", "total"):
+            lines.append(f'{prefix}_phase_seconds{{source="{name}",phase="{field}"}} {entry[field]}')
+    for field, help_text in (("bytes", "Response body bytes"), ("requests", "HTTP requests"),
+                             ("connections", "New connections opened"), ("items", "Items returned")):
+        lines.append(f"# HELP {prefix}_{field} {help_text} per source.")
+        lines.append(f"# TYPE {prefix}_{field} gauge")
+        for name, entry in sorted(stats.items()):
+            lines.append(f'{prefix}_{field}{{source="{name}"}} {entry[field]}')
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp, path)
+
+
+class _TimedConnectionMixin:
+    def _new_conn(self):
+        t0 = time.perf_counter()
+        try:
+            socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except OSError:
+            pass
+        t1 = time.perf_counter()
+        sock = super()._new_conn()
+        self.timings = {"dns": t1 - t0, "connect": time.perf_counter() - t1, "tls": 0.0}
+        return sock
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        t0 = time.perf_counter()
+        super().connect()
+        timings = getattr(self, "timings", None)
+        if timings:
+            timings["tls"] = max(0.0, time.perf_counter() - t0 - timings["dns"] - timings["connect"])
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """Pooled adapter that records connection and request timings into the current source."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool,
+                                                   "https": _TimedHTTPSConnectionPool}
+
+    def send(self, request, stream=False, **kwargs):
+        t0 = time.perf_counter()
+        response = super().send(request, stream=stream, **kwargs)
+        headers_at = time.perf_counter()
+        connection = getattr(response.raw, "connection", None) or getattr(response.raw, "_connection", None)
+        timings = getattr(connection, "timings", None)
+        setup = 0.0
+        if timings:
+            connection.timings = None  # only the request that opened the connection pays for it
+            setup = timings["dns"] + timings["connect"] + timings["tls"]
+            add(connections=1, **timings)
+        add(requests=1, ttfb=max(0.0, headers_at - t0 - setup))
+        if not stream:
+            body = response.content
+            add(download=time.perf_counter() - headers_at, bytes=len(body))
+        return response
@@ -0,0 +1,122 @@
+"""
+Sources served by JSON APIs: Weibo, V2EX, Tencent News and WallStreetCN.
+They decode responses with the json module only and never load the HTML
+parsing stack.
+"""
+
+import json
+from datetime import datetime
+from urllib.parse import quote
+
+import http_client
+import instrument
+from normalise import parse_time
+from sources import CACHE_TTLS, filter_items
+
+@instrument.timed('parse')
+def parse_weibo(body):
+    # JSON sources decode the raw bytes (json detects UTF-8/16/32), skipping requests' charset guessing
+    items = json.loads(body).get('data', {}).get('realtime', [])
+    
+    all_items = []
+    for item in items:
+        # key 'note' is usually the title, sometimes 'word'
+        title = item.get('note', '') or item.get('word', '')
+        if not title: continue
+        
+        # 'num' is the heat value
+        heat = item.get('num', 0)
+        
+        # Construct URL (usually search query)
+        # Web UI uses: https://s.weibo.com/weibo?q=%23TITLE%23&Refer=top
+        full_url = f"https://s.weibo.com/weibo?q={quote(title)}&Refer=top"
+        
+        all_items.append({
+            "source": "Weibo Hot Search", 
+            "title": title, 
+            "url": full_url, 
+            "heat": f"{heat}",
+            "time": "Real-time"
+        })
+    return all_items
+
+def fetch_weibo(limit=5, keyword=None, since=None):
+    # Use the PC Ajax API which returns JSON directly and is less rate-limited than scraping s.weibo.com
+    url = "https://weibo.com/ajax/side/hotSearch"
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Referer": "https://weibo.com/"
+    }
+    
+    response = http_client.get(url, headers=headers, ttl=CACHE_TTLS['weibo'])
+    response.raise_for_status()
+    # Hot searches are live, every one is inside any `since` window
+    return filter_items(parse_weibo(response.content), keyword)[:limit]
+
+@instrument.timed('parse')
+def parse_v2ex(body):
+    items = []
+    for t in json.loads(body):
+        # V2EX API fields: created, replies (heat)
+        replies = t.get('replies', 0)
+        created = t.get('created', 0)
+        items.append({
+            "source": "V2EX", 
+            "title": t['title'], 
+            "url": t['url'],
+            "heat": f"{replies} replies",
+            "time": "Hot",
+            "timestamp": float(created) if created else None
+        })
+    return items
+
+def fetch_v2ex(limit=5, keyword=None, since=None):
+    # Hot topics json
+    response = http_client.get("https://www.v2ex.com/api/topics/hot.json", ttl=CACHE_TTLS['v2ex'])
+    response.raise_for_status()
+    return filter_items(parse_v2ex(response.content), keyword, since)[:limit]
+
+@instrument.timed('parse')
+def parse_tencent(body):
+    items = []
+    for news in json.loads(body)['data']['tabs'][0]['articleList']:
+        time_str = news.get('pub_time', '') or news.get('publish_time', '')
+        items.append({
+            "source": "Tencent News", 
+            "title": news['title'], 
+            "url": news.get('url') or news.get('link_info', {}).get('url'),
+            "time": time_str,
+            "timestamp": parse_time(time_str)
+        })
+    return items
+
+def fetch_tencent(limit=5, keyword=None, since=None):
+    url = "https://i.news.qq.com/web_backend/v2/getTagInfo?tagId=aEWqxLtdgmQ%3D"
+    response = http_client.get(url, headers={"Referer": "https://news.qq.com/"}, ttl=CACHE_TTLS['tencent'])
+    response.raise_for_status()
+    return filter_items(parse_tencent(response.content), keyword, since)[:limit]
+
+@instrument.timed('parse')
+def parse_wallstreetcn(body, since=None):
+    # The flow is newest first: parsing stops at the first item older than `since`
+    items = []
+    for item in json.loads(body)['data']['items']:
+        res = item.get('resource')
+        if res and (res.get('title') or res.get('content_short')):
+             ts = res.get('display_time', 0)
+             if since and ts and ts < since: break
+             time_str = datetime.fromtimestamp(ts).strftime('%H:%M') if ts else ""
+             items.append({
+                 "source": "Wall Street CN", 
+                 "title": res.get('title') or res.get('content_short'), 
+                 "url": res.get('uri'),
+                 "time": time_str,
+                 "timestamp": float(ts) if ts else None
+             })
+    return items
+
+def fetch_wallstreetcn(limit=5, keyword=None, since=None):
+    url = "https://api-one.wallstcn.com/apiv1/content/information-flow?channel=global-channel&accept=article&limit=30"
+    response = http_client.get(url, ttl=CACHE_TTLS['wallstreetcn'])
+    response.raise_for_status()
+    return filter_items(parse_wallstreetcn(response.content, since), keyword, since)[:limit]
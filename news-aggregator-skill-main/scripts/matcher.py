@@ -0,0 +1,115 @@
+"""
+Compiled keyword matching for filter_items.
+
+A KeywordMatcher is built once per run from the comma-separated include and
+exclude lists. Matching is case-insensitive. Keywords that start/end with an
+ASCII letter or digit only match at ASCII word edges, so "AI" matches
+"AI芯片" and "用AI做" but not "said"; CJK keywords match anywhere inside
+Chinese text. Small lists use one compiled regex, large watchlists an
+Aho-Corasick automaton that scans each title once whatever the list size.
+"""
+
+import re
+from functools import lru_cache
+
+# From this many keywords on, the Aho-Corasick automaton beats regex alternation
+AHO_CORASICK_MIN = 50
+
+
+def _is_word(ch):
+    return ch.isascii() and (ch.isalnum() or ch == '_')
+
+
+def split_keywords(keyword):
+    if not keyword:
+        return []
+    return [k.strip() for k in keyword.split(',') if k.strip()]
+
+
+class _RegexEngine:
+    def __init__(self, keywords):
+        parts = []
+        for k in sorted(keywords, key=len, reverse=True):
+            pattern = re.escape(k)
+            if _is_word(k[0]): pattern = r'(?<![0-9a-z_])' + pattern
+            if _is_word(k[-1]): pattern = pattern + r'(?![0-9a-z_])'
+            parts.append(pattern)
+        self._regex = re.compile('|'.join(parts))
+
+    def search(self, text):
+        return self._regex.search(text) is not None
+
+
+class _AhoCorasickEngine:
+    def __init__(self, keywords):
+        # goto[state] maps char -> state; out[state] lists matched keywords ending there
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for k in keywords:
+            state = 0
+            for ch in k:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(k)
+
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def search(self, text):
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for k in out[state]:
+                start = i - len(k) + 1
+                if _is_word(k[0]) and start > 0 and _is_word(text[start - 1]): continue
+                if _is_word(k[-1]) and i + 1 < len(text) and _is_word(text[i + 1]): continue
+                return True
+        return False
+
+
+def _engine(keywords):
+    if len(keywords) >= AHO_CORASICK_MIN:
+        return _AhoCorasickEngine(keywords)
+    return _RegexEngine(keywords)
+
+
+class KeywordMatcher:
+    """Matches titles against include keywords, rejecting any exclude keyword."""
+
+    def __init__(self, include=(), exclude=()):
+        self.include = sorted({k.lower() for k in include if k})
+        self.exclude = sorted({k.lower() for k in exclude if k})
+        self._include = _engine(self.include) if self.include else None
+        self._exclude = _engine(self.exclude) if self.exclude else None
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def compile(cls, keyword=None, exclude=None):
+        """Builds (and memoises) a matcher from comma-separated keyword strings."""
+        return cls(split_keywords(keyword), split_keywords(exclude))
+
+    def __bool__(self):
+        return bool(self._include or self._exclude)
+
+    def match(self, text):
+        text = (text or '').lower()
+        if self._exclude and self._exclude.search(text):
+            return False
+        return self._include is None or self._include.search(text)
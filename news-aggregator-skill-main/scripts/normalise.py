@@ -0,0 +1,161 @@
+"""
+Numeric heat and time for items from different sources, and a global top-k.
+
+Every fetcher reports `heat` and `time` as free-form strings ("123 points",
+"1.2k stars", "1.2万", raw Weibo numbers, "Top Product"; "3 hours ago",
+"5分钟前", RFC 822 dates, "18:54"). `normalise()` adds, per source batch:
+
+- `heat_value`: the parsed number, or None when the source has no numeric heat;
+- `timestamp`: epoch seconds, or None when the time is not a point in time;
+- `heat_z`: z-score of the item's heat within its source's batch, so a hot HN
+  story and a hot Weibo topic land on the same scale. Heat is log-scaled first
+  (counts are heavy-tailed). Sources without numeric heat get a neutral 0.0:
+  list position is no measure of heat, as several listings (36Kr,
+  WallStreetCN, Tencent, Product Hunt) are newest first.
+
+`TopK` keeps the best N items seen so far in a min-heap, so a global top N is
+merged as sources finish without holding or sorting every item.
+"""
+
+import heapq
+import itertools
+import math
+import re
+import time
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+
+_NUMBER = re.compile(r"(\d+(?:[.,]\d+)*)\s*([kmb万亿w]?)(?![a-z])", re.I)
+_MULTIPLIERS = {"": 1, "k": 1e3, "m": 1e6, "b": 1e9, "w": 1e4, "万": 1e4, "亿": 1e8}
+_RELATIVE = re.compile(r"(\d+)\s*(second|minute|hour|day|week|month|year|秒|分钟|小时|天|周|个月|年)s?\s*(?:ago|前)", re.I)
+_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400, "week": 7 * 86400, "month": 30 * 86400,
+          "year": 365 * 86400, "秒": 1, "分钟": 60, "小时": 3600, "天": 86400, "周": 7 * 86400,
+          "个月": 30 * 86400, "年": 365 * 86400}
+_CLOCK = re.compile(r"^(?:(昨天|yesterday)\s*)?(\d{1,2}):(\d{2})$", re.I)
+_NOW_WORDS = {"real-time", "实时", "just now", "刚刚"}
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)\s*([smhdw])$", re.I)
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%Y/%m/%d %H:%M:%S", "%Y/%m/%d %H:%M")
+
+
+def parse_heat(heat):
+    """Number in a heat value ("1.2k stars" -> 1200.0, "1.2万" -> 12000.0); None if there is none."""
+    if isinstance(heat, (int, float)) and not isinstance(heat, bool):
+        return float(heat)
+    match = _NUMBER.search(str(heat or ""))
+    if not match:
+        return None
+    digits, suffix = match.groups()
+    try:
+        value = float(digits.replace(",", ""))
+    except ValueError:
+        return None
+    return value * _MULTIPLIERS[suffix.lower()]
+
+
+def parse_time(value, now=None):
+    """
+    Epoch seconds for a time value: epoch numbers, relative ages ("3 hours ago",
+    "5分钟前"), clock times (today, or yesterday if that would be in the future),
+    RFC 822 and ISO-like dates. "Real-time" means `now`; labels like "Today" or
+    "Hot" give None. Naive dates are taken as local time.
+    """
+    now = time.time() if now is None else now
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value) / (1000 if value > 1e11 else 1) if value else None
+    text = str(value or "").strip()
+    if not text:
+        return None
+    if text.lower() in _NOW_WORDS:
+        return now
+    match = _RELATIVE.search(text)
+    if match:
+        return now - int(match.group(1)) * _UNITS[match.group(2).lower()]
+    match = _CLOCK.match(text)
+    if match:
+        day = datetime.fromtimestamp(now)
+        moment = day.replace(hour=int(match.group(2)), minute=int(match.group(3)), second=0, microsecond=0)
+        if match.group(1) or moment.timestamp() > now + 60:
+            moment -= timedelta(days=1)
+        return moment.timestamp()
+    try:
+        return parsedate_to_datetime(text).timestamp()
+    except (TypeError, ValueError, IndexError):
+        pass
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        pass
+    for fmt in _FORMATS:
+        try:
+            return datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_since(value):
+    """
+    Returns a zero-arg callable giving the --since bound in epoch seconds: a
+    duration ("90m", "1h", "2d") slides with the clock, a date/time
+    ("2026-02-05", "2026-02-05T18:00") is fixed. Raises ValueError otherwise.
+    """
+    match = _DURATION.match(value.strip())
+    if match:
+        window = float(match.group(1)) * _DURATION_UNITS[match.group(2).lower()]
+        return lambda: time.time() - window
+    bound = datetime.fromisoformat(value.strip()).timestamp()
+    return lambda: bound
+
+
+def normalise(items, now=None):
+    """Adds `heat_value`, `timestamp` and `heat_z` to one source's items (in place); returns them."""
+    now = time.time() if now is None else now
+    for item in items:
+        item["heat_value"] = parse_heat(item.get("heat"))
+        if item.get("timestamp") is None:
+            item["timestamp"] = parse_time(item.get("time"), now)
+    numeric = [item for item in items if item["heat_value"] is not None]
+    # Scored by heat when most of the batch has it, otherwise neutral (the mean of every scored batch)
+    if not numeric or len(numeric) * 2 < len(items):
+        for item in items:
+            item["heat_z"] = 0.0
+        return items
+    scores = [math.log1p(max(item["heat_value"], 0.0)) if item["heat_value"] is not None else None
+              for item in items]
+    present = [s for s in scores if s is not None]
+    mean = sum(present) / len(present)
+    std = math.sqrt(sum((s - mean) ** 2 for s in present) / len(present))
+    floor = min(present)
+    for item, score in zip(items, scores):
+        score = floor if score is None else score
+        item["heat_z"] = round((score - mean) / std, 4) if std else 0.0
+    return items
+
+
+class TopK:
+    """The `n` items with the highest `key(item)` pushed so far (ties keep the earlier item)."""
+
+    def __init__(self, n, key=lambda item: item.get("heat_z", 0.0)):
+        self.n = n
+        self.key = key
+        self._heap = []
+        self._order = itertools.count()
+
+    def push(self, item):
+        # Earlier items get larger tie-breakers so they win ties and a later equal item cannot evict them
+        entry = (self.key(item), -next(self._order), item)
+        if self.n <= 0:
+            return
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def extend(self, items):
+        for item in items:
+            self.push(item)
+
+    def items(self):
+        """Best first."""
+        return [entry[2] for entry in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
@@ -0,0 +1,73 @@
+"""
+Speculative pagination for listing-style sources.
+
+`paginate` fetches the next pages concurrently instead of one after another,
+within a politeness budget: at most `prefetch` pages in flight and request
+starts spaced at least `interval` seconds apart. Pages are consumed in order;
+once `limit` selected items are collected, or `done` says no later page can
+hold wanted items, pages that have not started are cancelled and running ones
+are ignored.
+
+How far ahead it reads adapts to the yield seen so far: without a filter
+(`select`) page 1 is fetched alone and later windows cover only the pages
+the current items-per-page rate says are still needed; with a filter the
+yield is unknown up front, so the first window is a full `prefetch` pages.
+"""
+
+import concurrent.futures
+import contextvars
+import math
+import threading
+import time
+
+
+def paginate(fetch_page, limit, max_pages=5, prefetch=3, interval=0.5, select=None, done=None):
+    """
+    Returns up to `limit` items from pages 1..max_pages. `fetch_page(page)`
+    returns that page's items (an empty page ends pagination); `select(items)`
+    keeps the wanted ones; `done(items)` returning True ends pagination after
+    that page. An error on page 1 propagates, an error on a later page ends
+    pagination with what was collected.
+    """
+    stop = threading.Event()
+    lock = threading.Lock()
+    next_start = time.monotonic()
+
+    def run(page):
+        nonlocal next_start
+        with lock:
+            start = max(next_start, time.monotonic())
+            next_start = start + interval
+        if stop.wait(max(0.0, start - time.monotonic())):
+            return []
+        return fetch_page(page)
+
+    items = []
+    futures = {}
+    submitted = 0
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, prefetch))
+    try:
+        for page in range(1, max_pages + 1):
+            if page == 1:
+                window = prefetch if select else 1
+            elif items:
+                rate = len(items) / (page - 1)
+                window = math.ceil((limit - len(items)) / rate)
+            else:
+                window = prefetch
+            while submitted < min(page - 1 + max(1, min(window, prefetch)), max_pages):
+                submitted += 1
+                # Each page runs in a copy of the caller's context (e.g. instrument's current source)
+                futures[submitted] = pool.submit(contextvars.copy_context().run, run, submitted)
+            try:
+                page_items = futures.pop(page).result()
+            except Exception:
+                if page == 1: raise
+                break
+            if not page_items: break
+            items.extend(select(page_items) if select else page_items)
+            if len(items) >= limit or (done and done(page_items)): break
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+    return items[:limit]
@@ -0,0 +1,181 @@
+"""
+Main-content extraction for article pages.
+
+Instead of flattening the whole page, blocks are scored the way readability
+tools do: every paragraph-like element with enough text adds to its parent
+(and half to its grandparent) a score that grows with its length and
+punctuation (commas and Chinese full stops mark prose, not menus); divs
+without block children count as paragraphs. Containers
+get a bonus or penalty from their tag and class/id names, and each
+candidate's score is scaled down by its link density, so navigation, link
+lists and "related stories" blocks lose to the article body. Only the winning
+subtree is serialised to text, together with any sibling that scores at least
+SIBLING_SHARE of the winner or is a link-poor paragraph of prose (a lede
+often sits in its own block next to the body).
+
+Text length, link text and punctuation are totalled in one bottom-up walk of
+the tree, so scoring reads each string once rather than once per enclosing
+candidate. Boilerplate containers (cookie and consent banners, menus,
+sidebars, comment threads, share bars) are removed before scoring. Pages with
+no convincing candidate fall back to the whole-page text.
+"""
+
+import re
+
+from bs4 import CData, NavigableString
+
+import html_parser
+
+DROP_TAGS = ("script", "style", "noscript", "nav", "footer", "header", "aside", "form", "iframe", "svg", "button")
+BLOCK_TAGS = ("p", "pre", "td", "blockquote", "li", "h2", "h3")
+# A div with none of these inside holds running text, like a paragraph
+CONTAINER_TAGS = ("div", "p", "table", "ul", "ol", "pre", "blockquote", "section", "article", "main")
+UNLIKELY = re.compile(r"cookie|consent|gdpr|banner|combx|comment|community|disqus|menu|masthead|sidebar|"
+                      r"share|social|sponsor|promo|advert|(?:^|[\s_-])ads?(?:[\s_-]|$)|-ad-|adbox|ad-break|related|recommend|subscribe|newsletter|"
+                      r"popup|modal|breadcrumb|pagination|footer|header|nav|login|signup", re.I)
+LIKELY = re.compile(r"article|content|main|post|story|entry|text|body|column|shadow", re.I)
+POSITIVE = re.compile(r"article|body|content|entry|main|page|post|text|blog|story", re.I)
+NEGATIVE = re.compile(r"hidden|comment|com-|contact|foot|footer|footnote|masthead|meta|outbrain|promo|"
+                      r"related|scroll|shoutbox|sidebar|sponsor|shopping|tags|tool|widget|cookie|nav|menu", re.I)
+TAG_SCORES = {"article": 10, "main": 8, "div": 5, "section": 3, "pre": 3, "td": 3, "blockquote": 3,
+              "ol": -3, "ul": -3, "li": -3, "form": -3, "th": -5, "h1": -5, "h2": -5, "h3": -5}
+MIN_BLOCK_CHARS = 25
+MIN_CONTENT_CHARS = 100
+SIBLING_SHARE = 0.2
+SIBLING_MIN_SCORE = 10
+SIBLING_PARAGRAPH_CHARS = 80
+_PUNCTUATION = re.compile(r"[,，。、；;]")
+# The string types get_text() collects (not comments, doctypes or script bodies)
+_TEXT_TYPES = (NavigableString, CData)
+
+
+def _names(tag):
+    return " ".join(tag.get("class") or []) + " " + (tag.get("id") or "")
+
+
+def _class_weight(tag):
+    names = _names(tag)
+    return (25 if POSITIVE.search(names) else 0) - (25 if NEGATIVE.search(names) else 0)
+
+
+def _strip_boilerplate(soup):
+    for tag in soup.find_all(True):
+        # Descendants of a removed tag are wiped, name included (the `decomposed` property would search the tree)
+        if not tag.name or tag.name in ("html", "body", "article", "main"):
+            continue
+        if tag.name in DROP_TAGS:
+            tag.decompose()
+            continue
+        names = _names(tag)
+        if names.strip() and UNLIKELY.search(names) and not LIKELY.search(names):
+            tag.decompose()
+
+
+def _text_length(stat):
+    # Length of tag.get_text(" ", strip=True): the stripped strings joined by single spaces
+    return stat[0] + max(stat[1] - 1, 0)
+
+
+def _link_density(stat):
+    text_length = _text_length(stat)
+    return min(1.0, stat[2] / text_length) if text_length else 1.0
+
+
+def main_node(soup):
+    """The highest-scoring content container of a parsed page, or None."""
+    return _score(soup)[0]
+
+
+def _score(soup):
+    """
+    Strips boilerplate and scores the page in one bottom-up walk. Returns (best
+    node or None, {id(node): final score}, stats) where stats maps id(tag) to
+    (characters, non-empty strings, link characters, punctuation marks, has a
+    CONTAINER_TAGS descendant), so no subtree is read twice.
+    """
+    _strip_boilerplate(soup)
+    scores, nodes, stats = {}, {}, {}
+
+    def add(node, score):
+        if node is None or node.name in (None, "[document]", "html"):
+            return
+        if id(node) not in scores:
+            nodes[id(node)] = node
+            scores[id(node)] = TAG_SCORES.get(node.name, 0) + _class_weight(node)
+        scores[id(node)] += score
+
+    # Reversed document order visits every tag after all of its descendants
+    for node in reversed(list(soup.descendants)):
+        if node.name is None:
+            continue
+        chars = pieces = links = punctuation = 0
+        container = False
+        for child in node.children:
+            if child.name is None:
+                if type(child) in _TEXT_TYPES:
+                    text = child.strip()
+                    if text:
+                        chars += len(text)
+                        pieces += 1
+                        punctuation += len(_PUNCTUATION.findall(text))
+                continue
+            c_chars, c_pieces, c_links, c_punctuation, c_container = stats[id(child)]
+            chars += c_chars
+            pieces += c_pieces
+            links += c_links
+            punctuation += c_punctuation
+            container = container or c_container or child.name in CONTAINER_TAGS
+        stat = stats[id(node)] = (chars, pieces, links, punctuation, container)
+        if node.name == "a":
+            stats[id(node)] = stat = (chars, pieces, _text_length(stat), punctuation, container)
+
+        if node.name in BLOCK_TAGS or (node.name == "div" and not container):
+            text_length = _text_length(stat)
+            if text_length >= MIN_BLOCK_CHARS:
+                score = 1 + punctuation + min(text_length // 100, 3)
+                add(node.parent, score)
+                add(node.parent.parent if node.parent else None, score / 2)
+
+    best, best_score = None, 0.0
+    final = {}
+    for key, node in nodes.items():
+        final[key] = scores[key] * (1 - _link_density(stats[key]))
+        if final[key] > best_score:
+            best, best_score = node, final[key]
+    return best, final, stats
+
+
+def _with_siblings(best, scores, stats):
+    """`best` and the siblings that belong to the same article, in document order."""
+    if best.parent is None:
+        return [best]
+    threshold = max(SIBLING_MIN_SCORE, scores.get(id(best), 0.0) * SIBLING_SHARE)
+    picked = []
+    for sibling in best.parent.children:
+        if sibling is best:
+            picked.append(sibling)
+        elif sibling.name is None:
+            continue
+        elif scores.get(id(sibling), 0.0) >= threshold:
+            picked.append(sibling)
+        elif sibling.name in ("p", "div") and not stats[id(sibling)][4]:
+            stat = stats[id(sibling)]
+            if _text_length(stat) >= SIBLING_PARAGRAPH_CHARS and _link_density(stat) < 0.25:
+                picked.append(sibling)
+    return picked
+
+
+def main_text(markup, backend=None):
+    """
+    Text of the page's main content block; falls back to the whole page's
+    visible text when no block holds MIN_CONTENT_CHARS characters.
+    """
+    soup = html_parser.parse(markup, backend=backend)
+    node, scores, stats = _score(soup)
+    text = ""
+    if node is not None:
+        text = " ".join(part.get_text(" ", strip=True) for part in _with_siblings(node, scores, stats))
+    if len(text) < MIN_CONTENT_CHARS:
+        body = soup.body or soup
+        text = body.get_text(" ", strip=True)
+    return text
@@ -0,0 +1,86 @@
+"""
+Record/replay transports for offline runs and benchmarks.
+
+`RecordingAdapter` is a normal pooled adapter that also saves every GET
+response (status, headers, raw body) into a fixture directory.
+`ReplayAdapter` serves those recordings without any network access; URLs
+that were not recorded fail with a ConnectionError.
+
+Layout: <dir>/index.json maps URL -> {"file", "status", "headers"} and
+<dir>/<sha1>.body holds each body.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+KEEP_HEADERS = ("content-type", "etag", "last-modified", "retry-after")
+
+
+class RecordingAdapter(HTTPAdapter):
+    def __init__(self, directory, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, "index.json")
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if request.method != "GET":
+            return response
+        body = response.content  # later iter_content() calls are served from the read body
+        name = hashlib.sha1(request.url.encode("utf-8")).hexdigest() + ".body"
+        with open(os.path.join(self.directory, name), "wb") as f:
+            f.write(body)
+        with self._lock:
+            self.index[request.url] = {
+                "file": name,
+                "status": response.status_code,
+                "headers": {k: v for k, v in response.headers.items() if k.lower() in KEEP_HEADERS},
+            }
+            with open(self._index_path, "w", encoding="utf-8") as f:
+                json.dump(self.index, f, indent=1, ensure_ascii=False)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+        with open(os.path.join(directory, "index.json"), encoding="utf-8") as f:
+            self.index = json.load(f)
+        self.served = set()
+
+    def body(self, url):
+        with open(os.path.join(self.directory, self.index[url]["file"]), "rb") as f:
+            return f.read()
+
+    def send(self, request, **kwargs):
+        entry = self.index.get(request.url)
+        if entry is None:
+            raise requests.ConnectionError(f"not recorded: {request.url}", request=request)
+        self.served.add(request.url)
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = self.body(request.url)
+        response._content_consumed = True
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
@@ -0,0 +1,104 @@
+"""
+Retries and circuit breaking for the news sources.
+
+Transient HTTP failures (connection errors, timeouts, 429 and 5xx) are retried
+a bounded number of times with full-jitter exponential backoff. A persisted
+per-source circuit breaker opens after repeated failed runs and skips that
+source for a cooling-off window, so a dead source stops costing its timeout on
+every run; after the window one trial run is let through (half-open).
+"""
+
+import json
+import os
+import random
+import tempfile
+import time
+
+import requests
+
+from http_cache import CACHE_DIR
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def is_transient(error):
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRY_STATUSES
+    return False
+
+
+def backoff_delay(attempt, base=0.5, cap=4.0):
+    """Full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_after(response, cap=4.0):
+    """Seconds from a Retry-After header (numeric form only), bounded by `cap`."""
+    value = response.headers.get("Retry-After", "") if response is not None else ""
+    try:
+        return min(cap, max(0.0, float(value)))
+    except ValueError:
+        return None
+
+
+class CircuitBreaker:
+    """
+    Persisted per-source breaker. After `threshold` consecutive failed runs the
+    source is skipped for `cooldown` seconds; the next run after that is a trial
+    whose failure reopens the circuit immediately.
+    """
+
+    def __init__(self, path=None, threshold=3, cooldown=600):
+        self.path = path or os.path.join(CACHE_DIR, "circuits.json")
+        self.threshold = threshold
+        self.cooldown = cooldown
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._state = json.load(f)
+        except (OSError, ValueError):
+            self._state = {}
+
+    def allow(self, name):
+        """Returns (allowed, reason)."""
+        state = self._state.get(name)
+        if not state or state.get("opened_at") is None:
+            return True, None
+        wait = state["opened_at"] + self.cooldown - time.time()
+        if wait > 0:
+            return False, f"circuit open after {state['failures']} failures, retry in {wait:.0f}s"
+        return True, None
+
+    def record(self, name, ok):
+        state = self._state.setdefault(name, {"failures": 0, "opened_at": None})
+        if ok:
+            state.update(failures=0, opened_at=None)
+            return
+        state["failures"] += 1
+        # A failed half-open trial (opened_at set) or reaching the threshold (re)opens the circuit
+        if state["opened_at"] is not None or state["failures"] >= self.threshold:
+            state["opened_at"] = time.time()
+
+    def record_status(self, status):
+        for name, info in status.items():
+            if info["status"] != "skipped":
+                self.record(name, info["status"] == "ok")
+
+    def filter_jobs(self, jobs):
+        """Splits jobs into (allowed jobs, {name: skipped status})."""
+        allowed, skipped = {}, {}
+        for name, job in jobs.items():
+            ok, reason = self.allow(name)
+            if ok:
+                allowed[name] = job
+            else:
+                skipped[name] = {"status": "skipped", "elapsed": 0.0, "reason": reason}
+        return allowed, skipped
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._state, f)
+        os.replace(tmp, self.path)
@@ -0,0 +1,200 @@
+"""
+Concurrent scheduling helpers for the news aggregator.
+"""
+
+import queue
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def run_sources(jobs, deadline=None, source_deadline=None, on_result=None):
+    """
+    Runs every job in `jobs` (name -> zero-arg callable) in parallel.
+
+    `deadline` bounds the whole call, `source_deadline` bounds each job and may be
+    a number or a dict of per-source seconds. Jobs that miss their deadline are
+    dropped (their daemon thread is abandoned, so it never blocks interpreter exit).
+    `on_result(name, items)` is called from the calling thread as each job succeeds;
+    items handed to it are not kept in `results`, so streaming callers hold nothing.
+
+    Returns (results, status): results maps name -> list of items for completed
+    jobs, status maps name -> {"status": "ok" | "error" | "timeout", "elapsed", "reason"?}.
+    """
+    done = queue.Queue()
+    started = time.monotonic()
+    end = started + deadline if deadline else None
+
+    def limit_for(name):
+        if isinstance(source_deadline, dict):
+            return source_deadline.get(name)
+        return source_deadline
+
+    def worker(name, func):
+        t0 = time.monotonic()
+        try:
+            done.put((name, func(), None, time.monotonic() - t0))
+        except Exception as e:
+            done.put((name, None, e, time.monotonic() - t0))
+
+    expiry = {}
+    for name, func in jobs.items():
+        threading.Thread(target=worker, args=(name, func), daemon=True, name=f"source-{name}").start()
+        limit = limit_for(name)
+        bounds = [b for b in (end, started + limit if limit else None) if b is not None]
+        expiry[name] = min(bounds) if bounds else None
+
+    results, status = {}, {}
+    pending = set(jobs)
+    while pending:
+        now = time.monotonic()
+        for name in [n for n in pending if expiry[n] is not None and expiry[n] <= now]:
+            pending.discard(name)
+            status[name] = {
+                "status": "timeout",
+                "elapsed": round(now - started, 3),
+                "reason": f"deadline of {expiry[name] - started:.1f}s exceeded",
+            }
+        if not pending: break
+
+        waits = [expiry[n] - now for n in pending if expiry[n] is not None]
+        try:
+            name, items, error, elapsed = done.get(timeout=max(min(waits), 0) if waits else None)
+        except queue.Empty:
+            continue
+        if name not in pending: continue  # already dropped as late
+        pending.discard(name)
+        if error is not None:
+            status[name] = {"status": "error", "elapsed": round(elapsed, 3), "reason": repr(error)}
+        else:
+            items = items or []
+            status[name] = {"status": "ok", "elapsed": round(elapsed, 3), "count": len(items)}
+            if on_result:
+                on_result(name, items)
+            else:
+                results[name] = items
+    return results, status
+
+
+class HostScheduler:
+    """
+    Runs URL-bound tasks on `max_workers` threads while being polite per host:
+    at most `per_host` tasks in flight against one host, and a token bucket of
+    `rate` requests/second (bursts of `burst`) per host; a rate of 0 means
+    unlimited. Hosts are served round-robin so one crowded host never starves
+    the others. `host_limits` may override (per_host, rate) for specific hosts.
+    Raises ValueError for a per_host below 1 or a negative rate, which would
+    stall every worker.
+    """
+
+    def __init__(self, max_workers=10, per_host=2, rate=2.0, burst=2, host_limits=None):
+        for host, (limit, host_rate) in [(None, (per_host, rate))] + list((host_limits or {}).items()):
+            where = f" for {host}" if host else ""
+            if limit < 1:
+                raise ValueError(f"per-host concurrency{where} must be at least 1, got {limit}")
+            if host_rate < 0:
+                raise ValueError(f"per-host rate{where} must not be negative, got {host_rate}")
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.rate = rate
+        self.burst = burst
+        self.host_limits = host_limits or {}
+        self._stats = {}
+
+    def _limits(self, host):
+        return self.host_limits.get(host, (self.per_host, self.rate))
+
+    def map(self, func, tasks):
+        """
+        Runs func(url) for each (url, payload) in `tasks` and yields
+        (payload, result, error) in completion order, on the calling thread.
+        """
+        cond = threading.Condition()
+        pending = {}      # host -> [(url, payload, enqueued_at)]
+        order = []        # round-robin host rotation
+        active = {}
+        tokens = {}       # host -> (tokens, last refill)
+        done = queue.Queue()
+        now = time.monotonic()
+        for url, payload in tasks:
+            host = urlsplit(url or "").hostname or ""
+            if host not in pending:
+                pending[host] = []
+                order.append(host)
+            pending[host].append((url, payload, now))
+        remaining = sum(len(q) for q in pending.values())
+        if not remaining:
+            return
+        state = {"left": remaining}
+
+        def take():
+            # Called with cond held; returns a task or the seconds to wait
+            wait = None
+            for _ in range(len(order)):
+                host = order.pop(0)
+                order.append(host)
+                if not pending[host]: continue
+                per_host, rate = self._limits(host)
+                if active.get(host, 0) >= per_host: continue
+                t = time.monotonic()
+                level, last = tokens.get(host, (self.burst, t))
+                level = min(self.burst, level + (t - last) * rate) if rate else self.burst
+                if level < 1:
+                    tokens[host] = (level, t)
+                    needed = (1 - level) / rate
+                    wait = needed if wait is None else min(wait, needed)
+                    continue
+                tokens[host] = (level - 1, t)
+                active[host] = active.get(host, 0) + 1
+                url, payload, enqueued = pending[host].pop(0)
+                return host, url, payload, t - enqueued
+            return wait
+
+        def worker():
+            while True:
+                with cond:
+                    while True:
+                        if state["left"] == 0: return
+                        task = take()
+                        if isinstance(task, tuple): break
+                        cond.wait(task)
+                    state["left"] -= 1
+                host, url, payload, queued = task
+                t0 = time.monotonic()
+                try:
+                    result, error = func(url), None
+                except Exception as e:
+                    result, error = None, e
+                latency = time.monotonic() - t0
+                with cond:
+                    active[host] -= 1
+                    self._record(host, queued, latency, error)
+                    cond.notify_all()
+                done.put((payload, result, error))
+
+        threads = [threading.Thread(target=worker, daemon=True, name=f"host-worker-{i}")
+                   for i in range(min(self.max_workers, remaining))]
+        for t in threads: t.start()
+        for _ in range(remaining):
+            yield done.get()
+
+    def _record(self, host, queued, latency, error):
+        s = self._stats.setdefault(host, {"requests": 0, "errors": 0, "queued_total": 0.0, "queued_max": 0.0,
+                                          "latency_total": 0.0, "latency_max": 0.0})
+        s["requests"] += 1
+        s["errors"] += error is not None
+        s["queued_total"] += queued
+        s["queued_max"] = max(s["queued_max"], queued)
+        s["latency_total"] += latency
+        s["latency_max"] = max(s["latency_max"], latency)
+
+    def stats(self):
+        """Per-host request/error counts with average and max queueing and latency (seconds)."""
+        return {host: {
+            "requests": s["requests"],
+            "errors": s["errors"],
+            "queued_avg": round(s["queued_total"] / s["requests"], 3),
+            "queued_max": round(s["queued_max"], 3),
+            "latency_avg": round(s["latency_total"] / s["requests"], 3),
+            "latency_max": round(s["latency_max"], 3),
+        } for host, s in self._stats.items()}
@@ -0,0 +1,321 @@
+"""
+Serve mode: one warm process answering news queries from memory.
+
+Every `fetch_news.py` run pays interpreter start-up, imports, TLS handshakes
+and a full upstream round trip. `fetch_news.py --serve ADDR` instead keeps a
+snapshot of each source in memory and answers HTTP queries over TCP or a Unix
+socket:
+
+    GET /news?source=hackernews,weibo&limit=10&keyword=AI&deep=1
+    GET /stats
+
+A snapshot younger than the source's cache TTL is served as is. An older one,
+up to STALE_FACTOR times the TTL, is still served at once while a background
+refresh replaces it (stale-while-revalidate). Only a missing or expired
+snapshot makes the query wait, and concurrent queries for the same source share
+one upstream fetch (single-flight), so a burst of agent requests costs one
+upstream request per source. Queries filter, dedup and rank the snapshot
+in memory; deep-fetched article text is kept in memory too.
+
+/news returns the same JSON array as `fetch_news.py`; the per-source cache
+state ({"status": "fresh" | "stale" | "miss" | "error" | "timeout", "age"})
+is in the X-Sources response header. /stats reports per-source snapshot age and
+hit/stale/miss/refresh counts.
+"""
+
+import collections
+import concurrent.futures
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import instrument
+from dedup import dedup_items
+from matcher import KeywordMatcher
+from normalise import TopK, normalise, parse_since
+from sources import CACHE_TTLS, filter_items
+from urls import canonical_url
+
+# Snapshots are fetched at least this deep, so most limits and keyword filters are answered from one fetch
+SNAPSHOT_LIMIT = 30
+MAX_LIMIT = 100
+# Past its TTL a snapshot is served stale (and refreshed behind the query) for up to this many TTLs
+STALE_FACTOR = 10
+# Deep-fetched articles kept in memory, with the fields deep fetch adds
+CONTENT_ITEMS = 2000
+DEEP_FIELDS = ("content", "summary", "summary_tokens")
+
+
+class SnapshotCache:
+    """
+    Per-source item snapshots with stale-while-revalidate refresh and
+    single-flight upstream fetches. `fetchers` maps name -> callable(limit)
+    returning that source's items; any callable works, so a local stand-in
+    upstream can be plugged in for testing.
+    """
+
+    def __init__(self, fetchers, ttls=None, stale_factor=STALE_FACTOR, min_limit=SNAPSHOT_LIMIT):
+        self.fetchers = fetchers
+        self.ttls = ttls or CACHE_TTLS
+        self.stale_factor = stale_factor
+        self.min_limit = min_limit
+        self._snapshots = {}  # name -> {"items", "fetched", "limit"}
+        self._inflight = {}  # name -> Future of the refresh under way
+        self._lock = threading.Lock()
+        self._counts = {name: collections.Counter() for name in fetchers}
+
+    def get(self, name, limit):
+        """
+        Returns (state, future of the snapshot): "fresh" and "stale" futures are
+        already resolved (a stale one has started a background refresh), a
+        "miss" resolves when the upstream fetch completes.
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(name)
+            if snapshot and snapshot["limit"] >= limit:
+                age = time.time() - snapshot["fetched"]
+                ttl = self.ttls.get(name, 300)
+                if age < ttl * self.stale_factor:
+                    state = "fresh" if age < ttl else "stale"
+                    self._counts[name][state] += 1
+                    if state == "stale":
+                        self._refresh(name, snapshot["limit"])
+                    future = concurrent.futures.Future()
+                    future.set_result(snapshot)
+                    return state, future
+            self._counts[name]["miss"] += 1
+            return "miss", self._refresh(name, max(limit, self.min_limit))
+
+    def warm(self):
+        """Starts a background fetch of every source."""
+        with self._lock:
+            for name in self.fetchers:
+                self._refresh(name, self.min_limit)
+
+    def _refresh(self, name, limit):
+        # Caller holds the lock; joins the refresh already in flight, if any
+        if name in self._inflight:
+            return self._inflight[name]
+        future = self._inflight[name] = concurrent.futures.Future()
+        threading.Thread(target=self._fetch, args=(name, limit, future), daemon=True,
+                         name=f"refresh-{name}").start()
+        return future
+
+    def _fetch(self, name, limit, future):
+        try:
+            items = self.fetchers[name](limit)
+        except Exception as e:
+            sys.stderr.write(f"Refresh of {name} failed: {e}\n")
+            with self._lock:
+                self._counts[name]["error"] += 1
+                del self._inflight[name]
+            future.set_exception(e)
+            return
+        snapshot = {"items": items, "fetched": time.time(), "limit": limit}
+        with self._lock:
+            self._snapshots[name] = snapshot
+            self._counts[name]["refresh"] += 1
+            del self._inflight[name]
+        future.set_result(snapshot)
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            return {name: dict(self._counts[name],
+                               age=round(now - self._snapshots[name]["fetched"], 1) if name in self._snapshots else None,
+                               items=len(self._snapshots[name]["items"]) if name in self._snapshots else 0,
+                               refreshing=name in self._inflight)
+                    for name in self.fetchers}
+
+
+class NewsService:
+    """Answers /news queries from a SnapshotCache; `deep` is enrich_items_with_content with its store and scheduler bound."""
+
+    def __init__(self, fetchers, deep=None, source_timeout=15, ttls=None):
+        self.names = list(fetchers)
+        self.cache = SnapshotCache({name: self._job(name, f) for name, f in fetchers.items()}, ttls)
+        self.deep = deep
+        self.source_timeout = source_timeout
+        self._content = collections.OrderedDict()  # canonical URL -> {DEEP_FIELDS}, LRU
+        self._deep_lock = threading.Lock()
+
+    @staticmethod
+    def _job(name, fetch):
+        # Heat and time are normalised per snapshot, so heat_z compares across sources as in fetch_news
+        return lambda limit: instrument.run_source(name, lambda: normalise(fetch(limit)))
+
+    def query(self, params):
+        """
+        Items for a query ({param: value}); returns (items, status). Raises
+        ValueError for a bad parameter.
+        """
+        requested = params.get("source", "all")
+        names = self.names if requested == "all" else [n for n in dict.fromkeys(requested.split(",")) if n in self.names]
+        if not names:
+            raise ValueError(f"no such source: {requested!r}")
+        limit = min(_positive(params, "limit", 10), MAX_LIMIT)
+        top = _positive(params, "top") if "top" in params else None
+        since = parse_since(params["since"])() if params.get("since") else None
+        matcher = KeywordMatcher.compile(params.get("keyword"), params.get("exclude")) or None
+
+        pending = {name: self.cache.get(name, limit) for name in names}
+        concurrent.futures.wait([future for _, future in pending.values()], timeout=self.source_timeout)
+        now = time.time()
+        results, status = [], {}
+        for name in names:
+            state, future = pending[name]
+            if not future.done():
+                status[name] = {"status": "timeout"}
+                continue
+            if future.exception() is not None:
+                status[name] = {"status": "error", "reason": str(future.exception())}
+                continue
+            snapshot = future.result()
+            # Copies: the snapshot is shared by every query, deep fetch and dedup add fields
+            items = filter_items([dict(item) for item in snapshot["items"]], matcher, since)[:limit]
+            status[name] = {"status": state, "age": round(now - snapshot["fetched"], 1)}
+            results.extend(items)
+
+        if top:
+            heap = TopK(top)
+            heap.extend(results if params.get("no_dedup") else dedup_items(results))
+            results = heap.items()
+        elif not params.get("no_dedup"):
+            results = dedup_items(results)
+        if params.get("deep") not in (None, "", "0", "false") and results:
+            if self.deep is None:
+                raise ValueError("deep fetch is not available")
+            results = self.enrich(results)
+        return results, status
+
+    def enrich(self, items):
+        """Adds `content` (and summary fields) from memory, deep-fetching only articles not seen before."""
+        with self._deep_lock:
+            # One deep fetch at a time: a query waiting here finds the articles the previous one fetched
+            missing = [item for item in items if canonical_url(item["url"]) not in self._content]
+            if missing:
+                self.deep(missing)
+                for item in missing:
+                    if item.get("content"):
+                        self._content[canonical_url(item["url"])] = {
+                            field: item[field] for field in DEEP_FIELDS if field in item}
+            for item in items:
+                key = canonical_url(item["url"])
+                if key in self._content:
+                    self._content.move_to_end(key)
+                item.update(self._content.get(key, {"content": ""}))
+            while len(self._content) > CONTENT_ITEMS:
+                self._content.popitem(last=False)
+        return items
+
+    def stats(self):
+        stats = {"sources": self.cache.stats(), "content_items": len(self._content)}
+        if instrument.enabled():
+            stats["timings"] = instrument.snapshot()
+        return stats
+
+
+def _positive(params, name, default=None):
+    """Integer query parameter `name`; ValueError unless it is at least 1."""
+    value = params.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a positive integer, got {value!r}") from None
+    if value < 1:
+        raise ValueError(f"{name} must be a positive integer, got {value}")
+    return value
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "news-aggregator"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        service = self.server.service
+        if url.path in ("/", "/news"):
+            try:
+                items, status = service.query(params)
+            except ValueError as e:
+                return self._send(400, {"error": str(e)})
+            self._send(200, items, {"X-Sources": json.dumps(status)})
+        elif url.path == "/stats":
+            self._send(200, service.stats())
+        else:
+            self._send(404, {"error": f"no such path: {url.path}"})
+
+    def _send(self, code, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def parse_address(address):
+    """
+    ("unix", path) for "unix:/path/to.sock", (host, port) for "host:port" or
+    ":port" (localhost). Raises ValueError for anything else.
+    """
+    if address.startswith("unix:"):
+        if not address[len("unix:"):]:
+            raise ValueError(f"missing socket path in {address!r}")
+        return "unix", address[len("unix:"):]
+    host, sep, port = address.rpartition(":")
+    if not sep or not port.isdigit() or int(port) > 65535:
+        raise ValueError(f"expected host:port, :port or unix:/path, got {address!r}")
+    return host or "127.0.0.1", int(port)
+
+
+def make_server(address, service):
+    """
+    HTTP server for `address` (see `parse_address`). Port 0 picks a free port
+    (see `server.server_address`).
+    """
+    host, port = parse_address(address)
+    if host == "unix":
+        if os.path.exists(port):
+            os.unlink(port)
+        server = _UnixHTTPServer(port, _Handler)
+    else:
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def serve(address, fetchers, deep=None, source_timeout=15, warm=True):
+    """Runs the server until interrupted; with `warm`, every source is fetched at start-up."""
+    service = NewsService(fetchers, deep=deep, source_timeout=source_timeout)
+    server = make_server(address, service)
+    if warm:
+        service.cache.warm()
+    where = server.server_address
+    sys.stderr.write(f"Serving {len(fetchers)} sources on "
+                     f"{'unix:' + where if isinstance(where, str) else f'{where[0]}:{where[1]}'}\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if address.startswith("unix:") and os.path.exists(address[len("unix:"):]):
+            os.unlink(address[len("unix:"):])
@@ -0,0 +1,64 @@
+"""
+Registry of news sources.
+
+Each source declares the module that implements it and the third-party
+packages that module needs. Source modules are imported only when one of their
+sources is requested, so a run over the JSON APIs alone never imports
+BeautifulSoup, and a missing optional package only disables the sources that
+need it.
+"""
+
+import importlib
+import importlib.util
+
+from matcher import KeywordMatcher
+
+# name -> (module, fetch function, packages it needs); the order is the --source all order
+SOURCES = {
+    'hackernews': ('html_sources', 'fetch_hackernews', ('requests', 'bs4')),
+    'weibo': ('json_sources', 'fetch_weibo', ('requests',)),
+    'github': ('html_sources', 'fetch_github', ('requests', 'bs4')),
+    '36kr': ('html_sources', 'fetch_36kr', ('requests', 'bs4')),
+    'v2ex': ('json_sources', 'fetch_v2ex', ('requests',)),
+    'tencent': ('json_sources', 'fetch_tencent', ('requests',)),
+    'wallstreetcn': ('json_sources', 'fetch_wallstreetcn', ('requests',)),
+    'producthunt': ('html_sources', 'fetch_producthunt', ('requests', 'bs4')),
+}
+
+# Freshness TTL (seconds) per source: inside it a cached response is reused without network I/O
+CACHE_TTLS = {
+    'hackernews': 300, 'weibo': 60, 'github': 3600, '36kr': 300,
+    'v2ex': 600, 'tencent': 300, 'wallstreetcn': 120, 'producthunt': 1800
+}
+
+
+def filter_items(items, keyword=None, since=None):
+    # `keyword` is a KeywordMatcher built once in main(), or a comma-separated string (compiled once and memoised)
+    if since:
+        items = [item for item in items if in_window(item, since)]
+    if not keyword:
+        return items
+    matcher = keyword if isinstance(keyword, KeywordMatcher) else KeywordMatcher.compile(keyword)
+    return [item for item in items if matcher.match(item['title'])]
+
+
+def in_window(item, since):
+    """False only for items known to be older than `since` (items without a timestamp are kept)."""
+    return not since or item.get('timestamp') is None or item['timestamp'] >= since
+
+
+def missing_packages(name):
+    """The packages source `name` needs that are not installed."""
+    return [package for package in SOURCES[name][2] if importlib.util.find_spec(package) is None]
+
+
+def load_source(name):
+    """
+    Imports the module behind source `name` and returns its fetch function.
+    Raises ImportError naming the missing packages if any are not installed.
+    """
+    module, function, _ = SOURCES[name]
+    missing = missing_packages(name)
+    if missing:
+        raise ImportError(f"source {name!r} needs {', '.join(missing)} (pip install {' '.join(missing)})")
+    return getattr(importlib.import_module(module), function)
@@ -0,0 +1,146 @@
+"""
+Offline extractive summaries of deep-fetched article text.
+
+`--deep` content runs up to CONTENT_CHARS characters per item, far more than a
+prompt needs for a one- or two-line gist. `summarise_items()` picks the most
+central sentences of each article instead, as a batch stage over every
+enriched item:
+
+- sentences are split on Chinese and Western end punctuation (。！？；…, and
+  ". " before a capital, skipping abbreviations and initials);
+- each sentence becomes a TF-IDF vector over its words and CJK bigrams (the
+  tokens dedup uses), with IDF taken from the whole batch so phrases common to
+  every page (site names, bylines) weigh little;
+- sentences are ranked with TextRank: PageRank over the cosine-similarity
+  graph, lightly biased towards the lead as news puts the gist first. The
+  similarity matrices of the batch are stacked (padded to the longest article)
+  and ranked together, one NumPy power iteration for all items.
+
+The best sentences, in article order, fill about 1/ratio of the content;
+`summary_tokens` estimates the summary's prompt cost. Needs NumPy.
+"""
+
+import math
+import re
+
+import numpy as np
+
+from dedup import title_tokens
+
+RATIO = 5
+MIN_SUMMARY_CHARS = 120
+MIN_SENTENCE_CHARS = 12
+MAX_SENTENCES = 80
+DAMPING = 0.85
+# Sentence i of the lead gets prior weight 1 / (i + 1) ** LEAD_BIAS before normalising
+LEAD_BIAS = 0.5
+ITERATIONS = 50
+TOLERANCE = 1e-6
+
+_END = re.compile(r"[。！？!?；…]+[”」』）\"')]*|\.[”\"')]*(?=\s+[\"“‘(]?[A-Z0-9]|\s*$)")
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "st", "vs", "etc", "inc", "ltd", "co", "corp", "jr", "sr",
+                  "no", "fig", "e.g", "i.e", "u.s", "u.k", "jan", "feb", "mar", "apr", "jun", "jul", "aug",
+                  "sep", "sept", "oct", "nov", "dec"}
+_CJK_CHAR = re.compile(r"[㐀-䶿一-鿿豈-﫿　-〿＀-￯]")
+
+
+def split_sentences(text):
+    """Sentences of `text`, end punctuation (and closing quotes) kept."""
+    sentences, start = [], 0
+    for match in _END.finditer(text or ""):
+        if match.group().startswith("."):
+            words = text[start:match.start()].split()
+            word = words[-1].lower() if words else ""
+            if len(word) == 1 or word in _ABBREVIATIONS:
+                continue
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    tail = (text or "")[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def estimate_tokens(text):
+    """Rough LLM token count: about one per CJK character and one per four other characters."""
+    text = text or ""
+    cjk = len(_CJK_CHAR.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def _rank(graphs, sizes):
+    """TextRank scores for a (batch, n, n) stack of similarity matrices; row b uses its first sizes[b] sentences."""
+    batch, n, _ = graphs.shape
+    mask = np.arange(n)[None, :] < sizes[:, None]
+    graphs[:, np.arange(n), np.arange(n)] = 0.0
+    out_weight = graphs.sum(axis=2, keepdims=True)
+    transition = np.divide(graphs, out_weight, out=np.zeros_like(graphs), where=out_weight > 0)
+    dangling = (out_weight[:, :, 0] == 0) & mask
+    prior = np.where(mask, 1.0 / (np.arange(n)[None, :] + 1.0) ** LEAD_BIAS, 0.0)
+    prior /= np.maximum(prior.sum(axis=1, keepdims=True), 1e-12)
+    scores = prior.copy()
+    for _ in range(ITERATIONS):
+        # Sentences with no similar sentence hand their score back through the prior
+        spill = (scores * dangling).sum(axis=1, keepdims=True)
+        updated = (1 - DAMPING) * prior + DAMPING * (np.einsum("bi,bij->bj", scores, transition) + spill * prior)
+        converged = np.abs(updated - scores).sum() < TOLERANCE * batch
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def summarise_items(items, ratio=RATIO):
+    """
+    Adds `summary` and `summary_tokens` to every item with `content` (in place);
+    returns the items.
+    """
+    articles = []
+    for item in items:
+        sentences = split_sentences(item.get("content"))[:MAX_SENTENCES]
+        if sentences:
+            articles.append((item, sentences, [title_tokens(s) for s in sentences]))
+    if not articles:
+        return items
+
+    # IDF over every sentence in the batch
+    df = {}
+    for _, _, tokens in articles:
+        for sentence in tokens:
+            for token in sentence:
+                df[token] = df.get(token, 0) + 1
+    total = sum(len(tokens) for _, _, tokens in articles)
+
+    sizes = np.array([len(sentences) for _, sentences, _ in articles])
+    graphs = np.zeros((len(articles), sizes.max(), sizes.max()), dtype=np.float32)
+    for b, (_, _, tokens) in enumerate(articles):
+        vocabulary = {token: i for i, token in enumerate({t for sentence in tokens for t in sentence})}
+        vectors = np.zeros((len(tokens), max(len(vocabulary), 1)), dtype=np.float32)
+        for row, sentence in enumerate(tokens):
+            for token in sentence:
+                vectors[row, vocabulary[token]] = math.log(1 + total / df[token])
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        graphs[b, :len(tokens), :len(tokens)] = vectors @ vectors.T
+    scores = _rank(graphs, sizes)
+
+    for b, (item, sentences, _) in enumerate(articles):
+        budget = max(MIN_SUMMARY_CHARS, len(item["content"]) // ratio)
+        chosen, used = [], 0
+        for i in np.argsort(-scores[b, :len(sentences)], kind="stable"):
+            if len(sentences[i]) < MIN_SENTENCE_CHARS and len(sentences) > 1:
+                continue
+            if chosen and used + len(sentences[i]) > budget:
+                continue
+            chosen.append(i)
+            used += len(sentences[i])
+            if used >= budget:
+                break
+        summary = " ".join(sentences[i] for i in sorted(chosen))
+        # A single overlong sentence (or an article without end punctuation) is cut to the budget
+        if not chosen or len(summary) > 2 * budget:
+            summary = (summary or item["content"])[:budget]
+        item["summary"] = summary
+        item["summary_tokens"] = estimate_tokens(summary)
+    return items
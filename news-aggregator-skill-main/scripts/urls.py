@@ -0,0 +1,44 @@
+"""
+URL helpers shared by the content store and de-duplication.
+"""
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "spm", "share_token",
+}
+
+
+# Host prefixes that serve the same pages as the bare/desktop host
+MOBILE_PREFIXES = ("www.", "m.", "mobile.", "wap.")
+
+
+def canonical_url(url):
+    """
+    Normalises a URL so that trivially different links to the same page compare
+    equal: https scheme, lower-cased host without www/mobile prefix or default
+    port, no fragment or trailing slash, tracking parameters dropped and the
+    remaining query sorted.
+    """
+    if not url:
+        return url
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if (scheme, port) in (("http", 80), ("https", 443)): port = None
+    if scheme == "http": scheme = "https"
+    host = (parts.hostname or "").lower()
+    for prefix in MOBILE_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    netloc = f"{host}:{port}" if port else host
+    path = parts.path.rstrip("/") or "/"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS)
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
@@ -0,0 +1,123 @@
+"""
+Long-running watch mode for the news aggregator.
+
+One warm process polls each source on its own adaptive interval: a poll that
+finds new items halves the interval (down to the source's cache TTL, below
+which the response cache would answer anyway), a poll that finds nothing
+stretches it by half (up to 16x the TTL). A persisted seen-item set means
+only new items, or items whose title changed, are emitted, across restarts too.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+from http_cache import CACHE_DIR
+from scheduler import run_sources
+from urls import canonical_url
+
+
+class SeenStore:
+    """Persisted {item key: (title hash, last seen)} set; entries unseen for `max_age` are dropped."""
+
+    def __init__(self, path=None, max_age=7 * 24 * 3600):
+        self.path = path or os.path.join(CACHE_DIR, "seen.json")
+        self.max_age = max_age
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._seen = json.load(f)
+        except (OSError, ValueError):
+            self._seen = {}
+
+    @staticmethod
+    def key(item):
+        return canonical_url(item.get("url")) or "title:" + (item.get("title") or "")
+
+    def update(self, item):
+        """Records `item`; returns "new", "updated" (title changed) or None if already seen."""
+        key = self.key(item)
+        digest = hashlib.sha1((item.get("title") or "").encode("utf-8")).hexdigest()[:16]
+        previous = self._seen.get(key)
+        self._seen[key] = [digest, time.time()]
+        if previous is None:
+            return "new"
+        return "updated" if previous[0] != digest else None
+
+    def save(self):
+        cutoff = time.time() - self.max_age
+        self._seen = {k: v for k, v in self._seen.items() if v[1] >= cutoff}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._seen, f)
+        os.replace(tmp, self.path)
+
+
+class AdaptiveInterval:
+    def __init__(self, base, floor=None, ceiling=None):
+        self.floor = max(floor or base, 15)
+        self.ceiling = ceiling or base * 16
+        self.value = max(self.floor, base)
+
+    def observe(self, new_items):
+        if new_items:
+            self.value = max(self.floor, self.value / 2)
+        else:
+            self.value = min(self.ceiling, self.value * 1.5)
+        return self.value
+
+
+def watch(jobs, base_intervals, emit, process=None, seen=None, source_deadline=None, max_polls=None,
+          breaker=None, on_poll=None):
+    """
+    Polls `jobs` (name -> zero-arg fetcher) forever, or for `max_polls` rounds.
+    `process(items)` may post-process the fresh items of one poll (dedup, deep
+    fetch) and returns the items to emit; `emit(item)` writes one item, which
+    carries an `event` field of "new" or "updated". Sources whose `breaker`
+    circuit is open are skipped for that round. `on_poll()` runs after every round.
+    """
+    seen = seen or SeenStore()
+    intervals = {name: AdaptiveInterval(base_intervals.get(name, 300)) for name in jobs}
+    due = {name: 0.0 for name in jobs}
+    polls = 0
+    try:
+        while max_polls is None or polls < max_polls:
+            now = time.monotonic()
+            ready = [name for name in jobs if due[name] <= now]
+            if not ready:
+                time.sleep(min(due.values()) - now)
+                continue
+
+            batch, skipped = {name: jobs[name] for name in ready}, {}
+            if breaker: batch, skipped = breaker.filter_jobs(batch)
+            results, status = run_sources(batch, source_deadline=source_deadline)
+            if breaker:
+                breaker.record_status(status)
+                breaker.save()
+            status.update(skipped)
+            fresh = []
+            for name in ready:
+                new = []
+                for item in results.get(name, []):
+                    event = seen.update(item)
+                    if event:
+                        item["event"] = event
+                        new.append(item)
+                fresh.extend(new)
+                interval = intervals[name].observe(new)
+                due[name] = time.monotonic() + interval
+                info = status.get(name, {})
+                sys.stderr.write(f"[watch] {name}: {info.get('status')}, {len(new)} new, next poll in {interval:.0f}s\n")
+
+            for item in (process(fresh) if process and fresh else fresh):
+                emit(item)
+            seen.save()
+            if on_poll: on_poll()
+            polls += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        seen.save()
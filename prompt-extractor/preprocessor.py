@@ -1,16 +1,22 @@
 #!/usr/bin/env python3
 """
 提示词预处理和聚类脚本
-支持 txt, csv, json 格式的自动解析和清洗
+支持 txt, csv, json, jsonl 格式的自动解析和清洗
+加载、清洗、去重和统计均为流式处理，大文件（数 GB）也只占用与不重复提示词数量相当的内存
 """
 
 import json
 import csv
 import re
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from collections import Counter
 
+# 提示词字段/列名的识别顺序
+PROMPT_KEYS = ['prompt', 'text', 'description', 'content']
+# 流式读取 JSON 数组时每次读入的字符数
+JSON_CHUNK_SIZE = 1 << 16
+
 
 class PromptPreprocessor:
     """提示词预处理器"""
@@ -21,100 +27,154 @@ class PromptPreprocessor:
         self.metadata = {}
 
     def load_file(self, file_path: str) -> List[str]:
-        """自动识别格式并加载文件"""
+        """自动识别格式并加载文件（一次性返回列表；大文件请用 iter_file / process_file）"""
+        return list(self.iter_file(file_path))
+
+    def iter_file(self, file_path: str) -> Iterator[str]:
+        """
+        自动识别格式，逐条产出提示词（生成器，内存占用与文件大小无关）
+        支持 .txt, .csv, .json（数组，增量解析）, .jsonl/.ndjson（每行一个 JSON）
+        读取完毕后 metadata 中记录 format 和 original_count
+        """
         path = Path(file_path)
 
         if not path.exists():
             raise FileNotFoundError(f"文件不存在: {file_path}")
 
         suffix = path.suffix.lower()
+        loaders = {
+            '.txt': self._load_txt,
+            '.csv': self._load_csv,
+            '.json': self._load_json,
+            '.jsonl': self._load_jsonl,
+            '.ndjson': self._load_jsonl,
+        }
+        if suffix not in loaders:
+            raise ValueError(f"不支持的文件格式: {suffix}. 支持 .txt, .csv, .json, .jsonl")
 
-        if suffix == '.txt':
-            return self._load_txt(path)
-        elif suffix == '.csv':
-            return self._load_csv(path)
-        elif suffix == '.json':
-            return self._load_json(path)
-        else:
-            raise ValueError(f"不支持的文件格式: {suffix}. 支持 .txt, .csv, .json")
-
-    def _load_txt(self, path: Path) -> List[str]:
-        """加载txt文件（每行一个提示词）"""
-        with open(path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        self.metadata['format'] = 'jsonl' if suffix == '.ndjson' else suffix[1:]
+        return self._counted(loaders[suffix](path))
 
-        prompts = [line.strip() for line in lines if line.strip()]
-        self.metadata['format'] = 'txt'
-        self.metadata['original_count'] = len(prompts)
-        return prompts
+    def _counted(self, prompts: Iterator[str]) -> Iterator[str]:
+        count = 0
+        for prompt in prompts:
+            count += 1
+            yield prompt
+        self.metadata['original_count'] = count
 
-    def _load_csv(self, path: Path) -> List[str]:
-        """加载csv文件（自动识别提示词列）"""
+    def _load_txt(self, path: Path) -> Iterator[str]:
+        """加载txt文件（每行一个提示词，逐行读取）"""
         with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+    def _load_csv(self, path: Path) -> Iterator[str]:
+        """加载csv文件（自动识别提示词列，逐行读取）"""
+        with open(path, 'r', encoding='utf-8', newline='') as f:
             reader = csv.DictReader(f)
-            rows = list(reader)
-
-        if not rows:
-            return []
-
-        # 智能识别提示词列（包含 prompt, text, description 等关键词）
-        headers = list(rows[0].keys())
-        prompt_col = None
-
-        for keyword in ['prompt', 'text', 'description', 'content']:
-            for header in headers:
-                if keyword in header.lower():
-                    prompt_col = header
-                    break
-            if prompt_col:
-                break
-
-        # 如果没找到，使用第一列
-        if not prompt_col:
-            prompt_col = headers[0]
-
-        prompts = [row[prompt_col].strip() for row in rows if row.get(prompt_col, '').strip()]
-
-        self.metadata['format'] = 'csv'
-        self.metadata['prompt_column'] = prompt_col
-        self.metadata['original_count'] = len(prompts)
-
-        return prompts
-
-    def _load_json(self, path: Path) -> List[str]:
-        """加载json文件（支持数组或对象数组）"""
+            headers = reader.fieldnames
+            if not headers:
+                return
+
+            # 智能识别提示词列（包含 prompt, text, description 等关键词），没找到则用第一列
+            prompt_col = next((header for keyword in PROMPT_KEYS for header in headers
+                               if keyword in header.lower()), headers[0])
+            self.metadata['prompt_column'] = prompt_col
+
+            for row in reader:
+                value = (row.get(prompt_col) or '').strip()
+                if value:
+                    yield value
+
+    def _load_json(self, path: Path) -> Iterator[str]:
+        """加载json文件（字符串数组或对象数组），按元素增量解析，不把整个文件读入内存"""
+        prompt_key = None
+        for item in self._iter_json_array(path):
+            prompt, prompt_key = self._prompt_from(item, prompt_key)
+            if prompt is not None:
+                yield prompt
+
+    def _load_jsonl(self, path: Path) -> Iterator[str]:
+        """加载jsonl文件（每行一个字符串或对象）"""
+        prompt_key = None
         with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        if isinstance(data, list):
-            # 如果是字符串数组
-            if all(isinstance(item, str) for item in data):
-                prompts = data
-            # 如果是对象数组，尝试找到提示词字段
-            else:
-                prompt_key = None
-                for key in ['prompt', 'text', 'description', 'content']:
-                    if data and key in data[0]:
-                        prompt_key = key
-                        break
-
-                if not prompt_key:
-                    prompt_key = list(data[0].keys())[0] if data else None
-
-                prompts = [item[prompt_key] for item in data if prompt_key in item]
-                self.metadata['prompt_key'] = prompt_key
-        else:
-            raise ValueError("JSON格式错误：需要数组或对象数组")
-
-        self.metadata['format'] = 'json'
-        self.metadata['original_count'] = len(prompts)
-
-        return prompts
-
-    def clean_prompts(self, prompts: List[str]) -> List[str]:
-        """清洗提示词"""
-        cleaned = []
-
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"JSONL格式错误：第 {line_no} 行 {e.msg}") from e
+                prompt, prompt_key = self._prompt_from(item, prompt_key)
+                if prompt is not None:
+                    yield prompt
+
+    def _prompt_from(self, item: Any, prompt_key: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """从一个 JSON 元素取提示词；对象的提示词字段由第一个对象决定。返回 (提示词, 字段名)"""
+        if isinstance(item, str):
+            return item, prompt_key
+        if not isinstance(item, dict):
+            return None, prompt_key
+        if prompt_key is None and item:
+            prompt_key = next((key for key in PROMPT_KEYS if key in item), next(iter(item)))
+            self.metadata['prompt_key'] = prompt_key
+        return item.get(prompt_key), prompt_key
+
+    @staticmethod
+    def _iter_json_array(path: Path) -> Iterator[Any]:
+        """增量解析顶层 JSON 数组，逐个产出元素；内存只与单个元素大小相关"""
+        decoder = json.JSONDecoder()
+        with open(path, 'r', encoding='utf-8') as f:
+            buf, pos, eof = '', 0, False
+
+            def fill() -> bool:
+                # 丢弃已解析部分并读入下一块；到达文件末尾返回 False
+                nonlocal buf, pos, eof
+                chunk = f.read(JSON_CHUNK_SIZE)
+                buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+                return bool(chunk)
+
+            def skip_space() -> None:
+                nonlocal pos
+                while True:
+                    while pos < len(buf) and buf[pos] in ' \t\r\n':
+                        pos += 1
+                    if pos < len(buf) or not fill():
+                        return
+
+            skip_space()
+            if buf[pos:pos + 1] != '[':
+                raise ValueError("JSON格式错误：需要数组或对象数组")
+            pos += 1
+            skip_space()
+            if buf[pos:pos + 1] == ']':
+                return
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                    # 元素恰好结束在缓冲区末尾时可能被截断（如数字），再读一块确认
+                    if end == len(buf) and not eof:
+                        raise json.JSONDecodeError("数组未结束", buf, end)
+                except json.JSONDecodeError as e:
+                    if fill():
+                        continue
+                    raise ValueError(f"JSON格式错误：{e.msg}") from e
+                pos = end
+                yield item
+                skip_space()
+                if buf[pos:pos + 1] == ',':
+                    pos += 1
+                    skip_space()
+                elif buf[pos:pos + 1] == ']':
+                    return
+                else:
+                    raise ValueError("JSON格式错误：数组元素之间缺少逗号")
+
+    def iter_clean(self, prompts: Iterable[str]) -> Iterator[str]:
+        """逐条清洗提示词（规范空白和标点，过滤短提示）"""
         for prompt in prompts:
             # 去除多余空格
             prompt = re.sub(r'\s+', ' ', prompt.strip())
@@ -124,38 +184,66 @@ class PromptPreprocessor:
 
             # 过滤短提示
             if len(prompt) >= self.min_length:
-                cleaned.append(prompt)
+                yield prompt
 
-        # 去重（保持顺序）
+    def iter_unique(self, prompts: Iterable[str]) -> Iterator[str]:
+        """流式去重（保持顺序），内存只与不重复的提示词数量相关；遍历完毕后写入 metadata"""
         seen = set()
+        total = 0
+        for prompt in prompts:
+            total += 1
+            if prompt not in seen:
+                seen.add(prompt)
+                yield prompt
+
+        self.metadata['after_cleaning'] = len(seen)
+        self.metadata['duplicates_removed'] = total - len(seen)
+
+    def clean_prompts(self, prompts: Iterable[str]) -> List[str]:
+        """清洗并去重提示词"""
+        return list(self.iter_unique(self.iter_clean(prompts)))
+
+    def process_file(self, file_path: str, top_n: int = 20) -> Tuple[List[str], Dict[str, Any]]:
+        """
+        流式处理：加载 → 清洗 → 去重 → 统计，只遍历文件一次
+        峰值内存由不重复的提示词集合决定，而不是文件大小
+        返回 (去重后的提示词, 统计信息)，统计信息格式同 generate_stats
+        """
         unique = []
-        for p in cleaned:
-            if p not in seen:
-                seen.add(p)
-                unique.append(p)
+        word_counts = Counter()
+        total_length, min_length, max_length = 0, None, 0
+
+        for prompt in self.iter_unique(self.iter_clean(self.iter_file(file_path))):
+            unique.append(prompt)
+            word_counts.update(self._keywords(prompt))
+            total_length += len(prompt)
+            min_length = len(prompt) if min_length is None else min(min_length, len(prompt))
+            max_length = max(max_length, len(prompt))
+
+        stats = {
+            "total_prompts": len(unique),
+            "avg_length": total_length / len(unique) if unique else 0,
+            "min_length": min_length or 0,
+            "max_length": max_length,
+            "top_keywords": word_counts.most_common(top_n)
+        }
+        return unique, stats
 
-        self.metadata['after_cleaning'] = len(unique)
-        self.metadata['duplicates_removed'] = len(cleaned) - len(unique)
+    # 停用词（需要扩展）
+    STOPWORDS = {'a', 'an', 'the', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
 
-        return unique
+    def _keywords(self, prompt: str) -> List[str]:
+        """分词（简化版，按逗号和空格）并去掉停用词和短词"""
+        words = re.split(r'[,\s]+', prompt.lower())
+        words = [w.strip('.,!?;:()[]{}') for w in words]
+        return [w for w in words if w and w not in self.STOPWORDS and len(w) > 2]
 
-    def extract_keywords(self, prompts: List[str], top_n: int = 50) -> List[tuple]:
+    def extract_keywords(self, prompts: Iterable[str], top_n: int = 50) -> List[tuple]:
         """提取高频关键词（用于聚类）"""
-        # 简单的关键词提取（基于词频）
-        all_words = []
-
-        # 停用词（需要扩展）
-        stopwords = {'a', 'an', 'the', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-
+        # 简单的关键词提取（基于词频），逐条计数，不保留全部词语
+        word_counts = Counter()
         for prompt in prompts:
-            # 分词（简化版，按逗号和空格）
-            words = re.split(r'[,\s]+', prompt.lower())
-            words = [w.strip('.,!?;:()[]{}') for w in words]
-            words = [w for w in words if w and w not in stopwords and len(w) > 2]
-            all_words.extend(words)
-
-        # 统计词频
-        word_counts = Counter(all_words)
+            word_counts.update(self._keywords(prompt))
 
         return word_counts.most_common(top_n)
 
@@ -225,12 +313,10 @@ def main():
 
     preprocessor = PromptPreprocessor()
 
-    # 加载和清洗
+    # 流式加载、清洗、去重和统计
     print(f"正在加载: {input_file}")
-    prompts = preprocessor.load_file(input_file)
-    print(f"原始数量: {len(prompts)}")
-
-    prompts = preprocessor.clean_prompts(prompts)
+    prompts, stats = preprocessor.process_file(input_file)
+    print(f"原始数量: {preprocessor.metadata['original_count']}")
     print(f"清洗后: {len(prompts)}")
 
     # 聚类
@@ -239,9 +325,6 @@ def main():
     for cluster_id, cluster_prompts in clusters.items():
         print(f"  {cluster_id}: {len(cluster_prompts)} 条")
 
-    # 生成统计
-    stats = preprocessor.generate_stats(prompts)
-
     # 保存结果
     result = {
         "metadata": preprocessor.metadata,